@@ -0,0 +1,433 @@
+"""@package mbscheduler
+Module with periodic scheduler of the device `Loop`-script.
+
+Scheduler uses monotonic clock and absolute deadlines, so period doesn't drift
+with execution time of the script and doesn't jump when system clock is adjusted.
+"""
+
+import time
+import asyncio
+import inspect
+
+## @cond
+# `time.monotonic_ns()` is available since Python 3.7
+try:
+    _monotonic_ns = time.monotonic_ns
+except AttributeError:
+    def _monotonic_ns()->int:
+        return int(time.monotonic() * 1000000000)
+## @endcond
+
+Overrun_Skip    = 0 ##< Overrun policy: skip missed slots and wait for the next slot of the period grid
+Overrun_CatchUp = 1 ##< Overrun policy: run missed cycles one after another without sleeping
+
+MB_SCHEDULER_PERIOD_DEFAULT = 100 ##< Default period of the scheduler (millisec)
+MB_SCHEDULER_STOPCHECK = 50       ##< Max time of single sleep between checks of device stop flag (millisec)
+MB_SCHEDULER_SYNCSPIN = 300       ##< Time before expected server cycle when sync mode polls cycle counter (microsec)
+MB_SCHEDULER_SYNCPOLL = 50        ##< Sleep between polls of server cycle counter in sync mode (microsec)
+MB_SCHEDULER_SYNCCYCLE = 1000     ##< Initial estimate of server cycle time used by sync mode (microsec)
+
+
+class Task:
+    """Periodic task of the scheduler registered by `Scheduler.addtask()` or `mbdevice.every()`.
+
+       Task keeps its own statistics: count of runs, count of overruns
+       (task started one or more full periods later than its deadline)
+       and execution time of the last and the longest run.
+    """
+    def __init__(self, func, period:int, priority:int=0):
+        """
+        Constructor of the class.
+
+        Args:
+            func      Function without arguments called every period.
+            period    Period of the task (millisec).
+            priority  Priority of the task: task with greater value runs first when several tasks are due.
+        """
+        ## @cond
+        self._func = func
+        self._periodns = int(period * 1000000)
+        self._priority = priority
+        self._deadline = None
+        self._runs = 0
+        self._overruns = 0
+        self._lasttime = 0
+        self._maxtime = 0
+        ## @endcond
+
+    def __repr__(self):
+        return f"Task({self.getname()}, period={self.getperiod()}, priority={self._priority})"
+
+    def getfunction(self):
+        """Return function of the task."""
+        return self._func
+
+    def getname(self)->str:
+        """Return name of the task (name of its function)."""
+        return getattr(self._func, '__name__', repr(self._func))
+
+    def getperiod(self)->int:
+        """Return period of the task (millisec)."""
+        return self._periodns // 1000000
+
+    def getpriority(self)->int:
+        """Return priority of the task."""
+        return self._priority
+
+    def getruncount(self)->int:
+        """Return count of runs of the task."""
+        return self._runs
+
+    def getoverruncount(self)->int:
+        """Return count of runs which started one or more full periods later than deadline."""
+        return self._overruns
+
+    def getlasttime(self)->int:
+        """Return execution time of the last run of the task (microsec)."""
+        return self._lasttime // 1000
+
+    def getmaxtime(self)->int:
+        """Return max execution time of the task (microsec)."""
+        return self._maxtime // 1000
+
+    def resetstats(self):
+        """Reset statistics of the task."""
+        self._runs = 0
+        self._overruns = 0
+        self._lasttime = 0
+        self._maxtime = 0
+
+
+class Scheduler:
+    """Periodic scheduler of the device `Loop`-script.
+
+       Every cycle starts at absolute deadline `start + n * period` measured by monotonic clock.
+       `wait()` sleeps until the next deadline (checking device stop flag at least every
+       `MB_SCHEDULER_STOPCHECK` millisec) and returns `False` when device is stopped.
+
+       If cycle takes longer than period (overrun) the next start depends on overrun policy:
+       * `Overrun_Skip` (default) - missed slots are skipped, next cycle starts at the next slot of the grid;
+       * `Overrun_CatchUp` - missed cycles are executed one after another until schedule is caught up.
+
+       In sync mode (`setsynccycles(N)`, `N > 0`) period is not used and every cycle
+       starts once per `N` server sync cycles (`mbdevice.getcycle()`), right after Modbus Server app
+       synchronized device memory, so values written by the script are taken by the next sync pass.
+       Scheduler sleeps until the expected server cycle (estimated from observed cycle rate)
+       and then polls cycle counter with short sleeps (adaptive spin-then-sleep).
+
+       At the start of every cycle scheduler reports execution time of the previous cycle
+       and delay of the start to the loop statistics (`mbdevice.getloopstats()`).
+
+       Besides the main cycle scheduler runs periodic tasks (`addtask()`, `mbdevice.every()`)
+       with independent periods while it waits for the next cycle. Deadlines of all tasks
+       lie on the common grid `start + n * period` (phase-aligned), so e.g. task with
+       period 1000 always runs together with every 100th run of task with period 10.
+       Due tasks run in order of priority (greater first), tasks with equal priority -
+       in order of period (shorter first). Overrun policy of the scheduler is applied
+       to every task separately and overruns are counted per task (`Task.getoverruncount()`).
+
+       Scheduler of the current device is returned by `mbdevice.getscheduler()`.
+
+       Example:
+           sch = mbdevice.getscheduler()
+           sch.setperiod(10)
+           sch.setoverrunpolicy(mbscheduler.Overrun_CatchUp)
+    """
+    def __init__(self, device, period:int=MB_SCHEDULER_PERIOD_DEFAULT, policy:int=Overrun_Skip):
+        """
+        Constructor of the class.
+
+        Args:
+            device  Device object (`mbserver._MbDevice`) which stop flag is checked.
+            period  Period of cycle (millisec).
+            policy  Overrun policy: `Overrun_Skip` or `Overrun_CatchUp`.
+        """
+        ## @cond
+        self._device = device
+        self._periodns = 0
+        self._policy = policy
+        self._deadline = None
+        self._overruns = 0
+        self._cycles = 0
+        self._synccycles = 0
+        self._synctarget = None
+        self._lastcycle = None
+        self._lastpoll = 0
+        self._refcycle = None
+        self._reftime = 0
+        self._cycletime = MB_SCHEDULER_SYNCCYCLE * 1000
+        self._cyclestart = None
+        self._tasks = []
+        self._taskepoch = None
+        self.setperiod(period)
+        ## @endcond
+
+    def getperiod(self)->int:
+        """Return period of cycle (millisec)."""
+        return self._periodns // 1000000
+
+    def setperiod(self, period:int):
+        """
+        Set period of cycle (millisec).
+
+        New period is applied starting from the next cycle.
+        Raises `ValueError` if `period` is negative.
+        """
+        if period < 0:
+            raise ValueError(f"Invalid scheduler period: {period}")
+        self._periodns = int(period * 1000000)
+
+    def getoverrunpolicy(self)->int:
+        """Return overrun policy: `Overrun_Skip` or `Overrun_CatchUp`."""
+        return self._policy
+
+    def setoverrunpolicy(self, policy:int):
+        """Set overrun policy: `Overrun_Skip` or `Overrun_CatchUp`."""
+        if policy not in (Overrun_Skip, Overrun_CatchUp):
+            raise ValueError(f"Invalid overrun policy: {policy}")
+        self._policy = policy
+
+    def getsynccycles(self)->int:
+        """Return count of server sync cycles per cycle of the script (0 - timer mode)."""
+        return self._synccycles
+
+    def setsynccycles(self, count:int):
+        """
+        Set count of server sync cycles per cycle of the script.
+
+        `count > 0` turns sync mode on: every cycle of the script starts once per `count`
+        server sync cycles. `count = 0` returns to timer mode with the current period.
+        Raises `ValueError` if `count` is negative.
+        """
+        if count < 0:
+            raise ValueError(f"Invalid count of sync cycles: {count}")
+        self._synccycles = int(count)
+        self.reset()
+
+    def getcycletime(self)->int:
+        """Return estimated time of the server sync cycle (microsec) which is measured in sync mode."""
+        return self._cycletime // 1000
+
+    def getcyclecount(self)->int:
+        """Return count of cycles started by `wait()`."""
+        return self._cycles
+
+    def getoverruncount(self)->int:
+        """Return count of cycles which didn't finish before the next deadline."""
+        return self._overruns
+
+    def addtask(self, func, period:int, priority:int=0)->Task:
+        """
+        Register periodic task which runs while scheduler waits for the next cycle.
+
+        Args:
+            func      Function without arguments called every period.
+            period    Period of the task (millisec).
+            priority  Priority of the task: task with greater value runs first when several tasks are due.
+
+        Returns:
+            `Task` object with statistics of the task.
+
+        Raises `ValueError` if `period` is not positive or `func` is a coroutine function.
+        """
+        if period <= 0:
+            raise ValueError(f"Invalid task period: {period}")
+        if inspect.iscoroutinefunction(func):
+            raise ValueError(f"Coroutine function can't be a periodic task: {func}")
+        task = Task(func, period, priority)
+        self._tasks.append(task)
+        self._tasks.sort(key=lambda t: (-t._priority, t._periodns))
+        return task
+
+    def removetask(self, task:Task):
+        """Unregister periodic task `task`. Raises `ValueError` if task isn't registered."""
+        self._tasks.remove(task)
+
+    def gettasks(self)->list:
+        """Return list of registered periodic tasks in order of execution."""
+        return list(self._tasks)
+
+    def reset(self):
+        """Restart schedule: next `wait()` returns immediately and starts new period grid."""
+        self._deadline = None
+        self._synctarget = None
+        self._cyclestart = None
+        self._taskepoch = None
+        for task in self._tasks:
+            task._deadline = None
+
+    def wait(self)->bool:
+        """
+        Wait for the start of the next cycle.
+
+        First call returns immediately. Every next call sleeps until
+        the next deadline of the schedule.
+
+        Returns:
+            `True` if the next cycle must be executed, `False` if device is stopped.
+        """
+        ## @cond
+        steps = self._steps()
+        try:
+            while True:
+                time.sleep(next(steps))
+        except StopIteration as e:
+            return e.value
+        ## @endcond
+
+    async def waitasync(self)->bool:
+        """
+        Coroutine version of `wait()` which lets other asyncio tasks run while waiting.
+
+        Returns:
+            `True` if the next cycle must be executed, `False` if device is stopped.
+        """
+        ## @cond
+        steps = self._steps()
+        try:
+            while True:
+                await asyncio.sleep(next(steps))
+        except StopIteration as e:
+            return e.value
+        ## @endcond
+
+    ## @cond
+    def _steps(self):
+        # Generator of the wait for the next cycle: yields time to sleep (seconds)
+        # and returns `True` if cycle must be executed or `False` if device is stopped
+        if self._synccycles:
+            entry = _monotonic_ns()
+            if not (yield from self._syncsteps()):
+                return False
+            expected = self._reftime + ((self._synctarget - self._refcycle) & 0xFFFFFFFF) * self._cycletime \
+                       if self._refcycle is not None else entry
+            self._startcycle(entry, expected, self._synccycles * self._cycletime)
+            return True
+        entry = _monotonic_ns()
+        period = self._periodns
+        deadline = self._deadline
+        if deadline is None:
+            deadline = entry
+        else:
+            deadline += period
+            if entry > deadline and period:
+                self._overruns += 1
+                if self._policy == Overrun_Skip:
+                    deadline += ((entry - deadline) // period + 1) * period
+        self._deadline = deadline
+        if self._taskepoch is None:
+            self._taskepoch = deadline
+        device = self._device
+        stopcheck = MB_SCHEDULER_STOPCHECK * 1000000
+        while True:
+            if not (device.getflags() & 1):
+                return False
+            if self._tasks:
+                taskdeadline = self._runtasks()
+            now = _monotonic_ns()
+            remain = deadline - now
+            if remain <= 0:
+                break
+            if self._tasks and taskdeadline - now < remain:
+                remain = taskdeadline - now
+                if remain <= 0:
+                    continue
+            yield (remain if remain < stopcheck else stopcheck) / 1000000000
+        self._startcycle(entry, deadline, period)
+        return True
+
+    def _startcycle(self, entry:int, expected:int, period:int):
+        # Reports execution time of the previous cycle (till `wait()` was called at `entry`)
+        # and delay of the start of the new cycle relative to `expected` time
+        now = _monotonic_ns()
+        if self._cyclestart is not None:
+            jitter = now - expected
+            self._device._updateloopstats(entry - self._cyclestart, jitter if jitter > 0 else 0, period, self._overruns)
+        self._cyclestart = now
+        self._cycles += 1
+
+    def _pollcycle(self)->int:
+        # Returns count of server cycles left to the sync target and updates estimate of cycle time.
+        # Change of cycle is timed only by close polls, time of previous poll is used as time of
+        # the change, so estimated start of the next cycle is never late.
+        c = self._device.getcycle()
+        now = _monotonic_ns()
+        if c != self._lastcycle:
+            if self._lastcycle is not None and (now - self._lastpoll) < MB_SCHEDULER_SYNCSPIN * 1000:
+                # Reference point: cycle `c` started at the time of previous poll
+                if self._refcycle is not None:
+                    t = (self._lastpoll - self._reftime) // ((c - self._refcycle) & 0xFFFFFFFF)
+                    self._cycletime += (t - self._cycletime) // 8
+                self._refcycle = c
+                self._reftime = self._lastpoll
+            self._lastcycle = c
+        self._lastpoll = now
+        if self._synctarget is None:
+            self._synctarget = c
+        left = (self._synctarget - c) & 0xFFFFFFFF
+        return 0 if left & 0x80000000 else left
+
+    def _syncsteps(self):
+        device = self._device
+        n = self._synccycles
+        if self._synctarget is not None:
+            self._synctarget = (self._synctarget + n) & 0xFFFFFFFF
+            late = (self._device.getcycle() - self._synctarget) & 0xFFFFFFFF
+            if late and not (late & 0x80000000):
+                self._overruns += 1
+                if self._policy == Overrun_Skip:
+                    self._synctarget = (self._synctarget + ((late + n - 1) // n) * n) & 0xFFFFFFFF
+        spin = MB_SCHEDULER_SYNCSPIN * 1000
+        stopcheck = MB_SCHEDULER_STOPCHECK * 1000000
+        while True:
+            if not (device.getflags() & 1):
+                return False
+            if self._tasks:
+                taskdeadline = self._runtasks()
+            left = self._pollcycle()
+            if left == 0:
+                return True
+            remain = 0
+            if self._refcycle is not None:
+                remain = ((self._synctarget - self._refcycle) & 0xFFFFFFFF) * self._cycletime - (_monotonic_ns() - self._reftime) - spin
+            if self._tasks:
+                tremain = taskdeadline - _monotonic_ns()
+                if tremain <= 0:
+                    continue
+                if tremain < remain:
+                    remain = tremain
+            if remain > 0:
+                yield (remain if remain < stopcheck else stopcheck) / 1000000000
+            else:
+                yield MB_SCHEDULER_SYNCPOLL / 1000000
+
+    def _runtasks(self)->int:
+        # Runs all due periodic tasks in order of priority and returns the nearest deadline of tasks.
+        # Deadlines of tasks are aligned to the common grid `_taskepoch + n * period`.
+        now = _monotonic_ns()
+        epoch = self._taskepoch
+        if epoch is None:
+            epoch = self._taskepoch = now
+        due = []
+        for task in self._tasks:
+            if task._deadline is None:
+                task._deadline = epoch + ((now - epoch) // task._periodns) * task._periodns
+            if task._deadline <= now:
+                due.append(task)
+        for task in due:
+            period = task._periodns
+            start = _monotonic_ns()
+            late = start - task._deadline
+            if late >= period:
+                task._overruns += 1
+                if self._policy == Overrun_Skip:
+                    task._deadline += (late // period) * period
+            task._deadline += period
+            task._func()
+            t = _monotonic_ns() - start
+            task._lasttime = t
+            if t > task._maxtime:
+                task._maxtime = t
+            task._runs += 1
+        return min(task._deadline for task in self._tasks) if self._tasks else now + MB_SCHEDULER_STOPCHECK * 1000000
+    ## @endcond
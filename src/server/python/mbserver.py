@@ -7,14 +7,30 @@ More details.
 #from typing import Union
 
 from os import path
+import sys
 from ctypes import *
+from operator import itemgetter, index as _index
 import struct
+import re
 
 from typing import Union
+from contextlib import contextmanager
+from functools import lru_cache
+from collections import namedtuple
+from array import array
+from bisect import bisect_right
+from time import perf_counter, sleep
+import asyncio
 from PyQt5.QtCore import QSharedMemory
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from mbconfig import *
 import modbus
+import mbscheduler
 
 def swapbyteorder(data: bytearray) -> bytearray:
     """
@@ -51,6 +67,44 @@ MB_REGISTERORDER_R2R3R0R1 = 3
 
 MB_BYTEORDER_DEFAULT = 'little'
 
+# Max count of raw (`int`/`str`) addresses kept resolved by `_MbDevice`
+MB_ADDRESSCACHE_SIZE = 1024
+
+# Max count of compiled `read_many()`/`write_many()` plans kept by `_MbDevice`
+MB_IOPLANCACHE_SIZE = 32
+# Default max gap (registers for 3x/4x, bits for 0x/1x) between items merged into single block copy
+MB_IOPLAN_GAP = 16
+
+# Max count of compiled `unpack()`/`pack()` formats kept by every register memory object
+MB_FORMATCACHE_SIZE = 64
+
+# Count of registers/bits read with single lock by iterator of memory object
+MB_ITERCHUNK_SIZE = 1024
+
+# Interval of polling memory changes by `changed()` coroutine (seconds)
+MB_CHANGEPOLL = 0.001
+
+# Bits of device flags (`_MbDevice.getflags()`)
+MB_DEVICEFLAG_RUN  = 1 # device script is running
+MB_DEVICEFLAG_SYNC = 2 # memory sync pass of Modbus Server app is in progress
+
+# Sleep before retry of `snapshot()` which overlapped with memory sync pass (seconds)
+MB_SNAPSHOT_RETRYSLEEP = 0.0001
+
+# Supported data types: name -> (size in bytes, `struct` format character)
+MB_DATATYPES = {
+    'int8'  : (1, 'b'),
+    'uint8' : (1, 'B'),
+    'int16' : (2, 'h'),
+    'uint16': (2, 'H'),
+    'int32' : (4, 'i'),
+    'uint32': (4, 'I'),
+    'int64' : (8, 'q'),
+    'uint64': (8, 'Q'),
+    'float' : (4, 'f'),
+    'double': (8, 'd'),
+}
+
 # Note (Feb 08 2025): c_long type was replaced by c_int because
 #                     on some platforms c_long is size of 8 bytes
 
@@ -68,14 +122,200 @@ class CDeviceBlock(Structure):
                 ("stoDeviceName"     , c_uint),
                 ("stringTableSize"   , c_uint)]
 
+# Upper bounds of the loop start jitter histogram buckets (microsec), last bucket is above the last bound
+MB_LOOPJITTER_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000)
+
 class CPythonBlock(Structure): 
-    _fields_ = [("pycycle"           , c_uint)]
+    _fields_ = [("pycycle"           , c_uint),
+                ("version"           , c_uint),
+                ("period"            , c_uint),
+                ("execLast"          , c_uint),
+                ("execMin"           , c_uint),
+                ("execMax"           , c_uint),
+                ("execAvg"           , c_uint),
+                ("overrunCount"      , c_uint),
+                ("lockTime"          , c_uint),
+                ("lockCount"         , c_uint),
+                ("jitterHist"        , c_uint * (len(MB_LOOPJITTER_BUCKETS)+1))]
+
+# Python block layout version which contains loop statistics
+MB_PYTHONBLOCK_VERSION_LOOPSTATS = 1
+
+## @cond
+# Loop statistics returned by `_MbDevice.getloopstats()`
+_MbLoopStats = namedtuple('LoopStats', ('cycles', 'period', 'last', 'min', 'max', 'avg', 'overruns', 'locktime', 'lockcount', 'jitter'))
+## @endcond
 
 class CMemoryBlockHeader(Structure): 
     _fields_ = [("changeCounter"     , c_uint),
                 ("changeByteOffset"  , c_uint),
                 ("changeByteCount"   , c_uint),
-                ("dummy"             , c_uint)]
+                ("version"           , c_uint),
+                ("dirtyPageShift"    , c_uint),
+                ("dirtyPageCount"    , c_uint),
+                ("serverChangeCounter", c_uint),
+                ("reserved1"         , c_uint)]
+
+# Memory block layout version which contains dirty page bitmap after memory mask
+MB_MEMORYBLOCK_VERSION_DIRTYPAGES = 1
+# Memory block layout version which contains server change counter and page change stamps
+MB_MEMORYBLOCK_VERSION_CHANGESTAMPS = 2
+
+
+class _MbPermStruct:
+    # `struct.Struct`-like converter for values with mixed byte/register order.
+    # `perm[i]` is index of the memory byte which is i-th byte of little-endian value
+    def __init__(self, fmt:str, perm:tuple):
+        self._st = struct.Struct('<'+fmt)
+        self.size = self._st.size
+        self.format = fmt
+        inv = [0] * len(perm)
+        for i, p in enumerate(perm):
+            inv[p] = i
+        self._pick  = itemgetter(*perm)
+        self._place = itemgetter(*inv)
+
+    def unpack(self, buffer)->tuple:
+        return self._st.unpack(bytes(self._pick(buffer)))
+
+    def unpack_from(self, buffer, offset:int=0)->tuple:
+        return self._st.unpack(bytes(self._pick(buffer[offset:offset+self.size])))
+
+    def pack(self, *values)->bytes:
+        return bytes(self._place(self._st.pack(*values)))
+
+    def pack_into(self, buffer, offset:int, *values):
+        buffer[offset:offset+self.size] = bytes(self._place(self._st.pack(*values)))
+
+
+def _readonlyview(view:memoryview, address:int)->memoryview:
+    # Returns read-only copy of `view` over raw memory at `address`
+    # (`memoryview.toreadonly()` is available only since Python 3.8)
+    if hasattr(view, 'toreadonly'):
+        return view.toreadonly()
+    frommemory = pythonapi.PyMemoryView_FromMemory
+    frommemory.argtypes = (c_void_p, c_ssize_t, c_int)
+    frommemory.restype = py_object
+    return frommemory(address, view.nbytes, 0x100) # PyBUF_READ
+
+
+class _MbLockProfiler:
+    # Stand-in for `QSharedMemory` which measures time of holding the lock.
+    # `stats` is list `[seconds, count]` shared by all memory objects of the device
+    __slots__ = ('_shm', '_stats', '_t')
+
+    def __init__(self, shm, stats:list):
+        self._shm = shm
+        self._stats = stats
+        self._t = 0.0
+
+    def lock(self)->bool:
+        r = self._shm.lock()
+        self._t = perf_counter()
+        return r
+
+    def unlock(self)->bool:
+        stats = self._stats
+        stats[0] += perf_counter() - self._t
+        stats[1] += 1
+        return self._shm.unlock()
+
+    def detach(self)->bool:
+        return self._shm.detach()
+
+
+class _MbNoLock:
+    # Stand-in for `QSharedMemory` lock functions when memory is already locked by transaction
+    # or is not shared at all (snapshot)
+    def lock(self)->bool:
+        return True
+
+    def unlock(self)->bool:
+        return True
+
+    def detach(self)->bool:
+        return True
+
+_MB_NOLOCK = _MbNoLock()
+
+
+def _makecodec(fmt:str, perm:tuple):
+    # Returns precompiled converter with `unpack`, `unpack_from`, `pack` and `pack_into` functions
+    size = len(perm)
+    if perm == tuple(range(size)):
+        return struct.Struct('<'+fmt)
+    if perm == tuple(range(size-1, -1, -1)):
+        return struct.Struct('>'+fmt)
+    return _MbPermStruct(fmt, perm)
+
+
+class _MbLayout:
+    # Compiled converter of sequence of register fields `(datatype, bytecount)` for byte/register
+    # order of memory object. Every field starts at register boundary, `int8`/`uint8` field occupies
+    # single register (first byte) and 'string' field occupies `(bytecount+1)//2` registers.
+    # When all fields have the same plain byte order whole layout is converted by single
+    # `struct.Struct`, otherwise every field is converted by its own codec.
+    def __init__(self, mem, fields):
+        offsets = []
+        fmts = []
+        orders = set()
+        self._strings = []
+        byteoffset = 0
+        for i, (datatype, bytecount) in enumerate(fields):
+            if datatype == 'string':
+                size = bytecount
+                fmt = f'{bytecount}s'
+                self._strings.append((i, bytecount))
+            else:
+                size, fmt = mem._getdatatype(datatype)
+                if size > 1:
+                    orders.add(mem._getnumpyorder(size))
+            regbytes = (size + 1) & ~1
+            fmts.append(fmt + 'x' * (regbytes - size))
+            offsets.append(byteoffset)
+            byteoffset += regbytes
+        self.size = byteoffset
+        self._swapstrings = (mem._byteorder == 'big')
+        if len(orders) <= 1 and None not in orders:
+            order = orders.pop() if orders else '<'
+            self._struct = struct.Struct(order + ''.join(fmts))
+            self._codecs = None
+        else:
+            self._struct = None
+            self._codecs = [(o, None if datatype == 'string' else mem._codecs[datatype], bytecount)
+                            for o, (datatype, bytecount) in zip(offsets, fields)]
+
+    def _decodestrings(self, values:list)->list:
+        for i, bytecount in self._strings:
+            b = values[i]
+            if self._swapstrings:
+                b = bytes(swapbyteorder(bytearray(b)))
+            values[i] = b.split(b'\x00', 1)[0].decode()
+        return values
+
+    def unpack_from(self, buffer, offset:int=0)->list:
+        if self._struct is not None:
+            values = list(self._struct.unpack_from(buffer, offset))
+        else:
+            values = [bytes(buffer[offset+o:offset+o+n]) if codec is None else codec.unpack_from(buffer, offset+o)[0]
+                      for o, codec, n in self._codecs]
+        return self._decodestrings(values) if self._strings else values
+
+    def pack(self, values)->bytes:
+        values = list(values)
+        for i, bytecount in self._strings:
+            v = values[i]
+            b = (v.encode() if isinstance(v, str) else bytes(v))[:bytecount].ljust(bytecount, b'\x00')
+            values[i] = swapbyteorder(bytearray(b)) if self._swapstrings else b
+        if self._struct is not None:
+            return self._struct.pack(*values)
+        buf = bytearray(self.size)
+        for (o, codec, n), v in zip(self._codecs, values):
+            if codec is None:
+                buf[o:o+n] = v
+            else:
+                codec.pack_into(buf, o, v)
+        return bytes(buf)
 
 ## @endcond
 
@@ -100,6 +340,13 @@ class _MemoryBlock:
         else:
             self._byteorder = 'little'
         self._registerorder = regorder
+        # Byte permutation for every value size: `value_le[i] = mem[perm[i]]`
+        self._byteperm = { 1: (0,),
+                           2: (1, 0) if self._byteorder == 'big' else (0, 1),
+                           4: tuple(self.swap32(bytearray(range(4)))),
+                           8: tuple(self.swap64(bytearray(range(8)))) }
+        # Precompiled codec for every data type: single `unpack_from`/`pack_into` per value
+        self._codecs = { name: _makecodec(fmt, self._byteperm[size]) for name, (size, fmt) in MB_DATATYPES.items() }
         shm = QSharedMemory(shmid)
         res = shm.attach()
         if not res:
@@ -109,12 +356,39 @@ class _MemoryBlock:
         sz = shm.size()
         cbytes = bytecount if bytecount <= sz else sz
         self._shm = shm
+        self._locker = shm
+        self._txndepth = 0
+        self._txnbegin = 0
+        self._txnend = 0
+        # Write suppression (see `setwritesuppression()`) and its counters
+        self._suppress = False
+        self._writecount = 0
+        self._suppresscount = 0
         self._countbytes = cbytes
         self._id = id
         ptrhead = cast(memptr, POINTER(CMemoryBlockHeader))
         self._head = ptrhead[0]
-        self._pmembytes = cast(byref(ptrhead[1]),POINTER(c_ubyte*1))
-        self._pmaskbytes = cast(byref(cast(byref(ptrhead[1]),POINTER(c_byte*cbytes))[1]),POINTER(c_ubyte*1))
+        # Persistent buffer-protocol views over data and mask parts of the shared segment
+        memaddr = memptr.value + sizeof(CMemoryBlockHeader)
+        self._memaddr = memaddr
+        self._mem  = memoryview((c_ubyte*cbytes).from_address(memaddr)).cast('B')
+        self._mask = memoryview((c_ubyte*cbytes).from_address(memaddr+cbytes)).cast('B')
+        self._memro  = _readonlyview(self._mem , memaddr)
+        self._maskro = _readonlyview(self._mask, memaddr+cbytes)
+        # Dirty page bitmap (one bit per changed page) which is read by Modbus Server app
+        self._dirty = None
+        self._dirtyshift = 0
+        # Page change stamps (value of `serverChangeCounter` when page was changed by Modbus Server app)
+        self._stamps = None
+        if self._head.version >= MB_MEMORYBLOCK_VERSION_DIRTYPAGES:
+            pagecount = self._head.dirtyPageCount
+            dirtybytes = (pagecount + 7) // 8
+            if sizeof(CMemoryBlockHeader) + cbytes * 2 + dirtybytes <= sz:
+                self._dirty = memoryview((c_ubyte*dirtybytes).from_address(memaddr+cbytes*2)).cast('B')
+                self._dirtyshift = self._head.dirtyPageShift
+            stampsoffset = (sizeof(CMemoryBlockHeader) + cbytes * 2 + dirtybytes + 3) & ~3
+            if self._head.version >= MB_MEMORYBLOCK_VERSION_CHANGESTAMPS and stampsoffset + pagecount * 4 <= sz:
+                self._stamps = memoryview((c_uint32*pagecount).from_address(memptr.value+stampsoffset)).cast('B').cast('I')
 
     def __del__(self):
         try:
@@ -122,8 +396,64 @@ class _MemoryBlock:
         except RuntimeError:
             pass
     
+    def _markdirty(self, byteoffset:int, rightedge:int):
+        dirty = self._dirty
+        p = byteoffset >> self._dirtyshift
+        last = (rightedge - 1) >> self._dirtyshift
+        while p <= last and (p & 7):
+            dirty[p >> 3] |= 1 << (p & 7)
+            p += 1
+        # Whole bitmap bytes
+        if last - p >= 8:
+            c = (last + 1 - p) >> 3
+            i = p >> 3
+            dirty[i:i+c] = b'\xFF' * c
+            p += c << 3
+        while p <= last:
+            dirty[p >> 3] |= 1 << (p & 7)
+            p += 1
+
+    def _snapshot(self):
+        # Returns read-only copy of the memory object (memory must be locked by caller).
+        # Copy shares converters with the current object and reuses all its get functions.
+        s = object.__new__(type(self))
+        s.__dict__.update(self.__dict__)
+        s._shm = _MB_NOLOCK
+        s._locker = _MB_NOLOCK
+        s._txndepth = 0
+        s._head = None
+        s._dirty = None
+        s._stamps = None
+        s._mem = memoryview(bytes(self._mem))
+        s._mask = memoryview(bytes(self._countbytes))
+        s._memro = s._mem
+        s._maskro = s._mask
+        s._memaddr = 0
+        return s
+
+    def _pagestorange(self, byteoffset:int, byteend:int)->tuple:
+        # Converts byte range into `(offset, count)` of memory units clipped by memory size
+        offset = byteoffset * 8 // self._unitbits
+        end = byteend * 8 // self._unitbits
+        if end > self._count:
+            end = self._count
+        return (offset, end - offset)
+
     def _recalcheader(self, byteoffset:int, bytecount:int):
         rightedge = byteoffset + bytecount
+        if self._dirty is not None and bytecount:
+            self._markdirty(byteoffset, rightedge)
+        if self._txndepth:
+            # Header is updated once at the end of transaction
+            if self._txnend <= self._txnbegin:
+                self._txnbegin = byteoffset
+                self._txnend = rightedge
+            else:
+                if byteoffset < self._txnbegin:
+                    self._txnbegin = byteoffset
+                if rightedge > self._txnend:
+                    self._txnend = rightedge
+            return
         if self._head.changeByteOffset > byteoffset:
             if self._head.changeByteCount == 0:
                 self._head.changeByteCount = rightedge - byteoffset
@@ -140,12 +470,115 @@ class _MemoryBlock:
                 c = self._countbytes - byteoffset
             else:
                 c = count
-            self._shm.lock()
-            b = bytestype(cast(self._pmembytes[byteoffset], POINTER(c_ubyte*c))[0])
-            self._shm.unlock()
+            self._locker.lock()
+            b = bytestype(self._mem[byteoffset:byteoffset+c])
+            self._locker.unlock()
             return b
         return bytestype()
 
+    def _begintransaction(self):
+        if self._txndepth == 0:
+            self._shm.lock()
+            self._locker = _MB_NOLOCK
+            self._txnbegin = 0
+            self._txnend = 0
+        self._txndepth += 1
+
+    def _endtransaction(self):
+        self._txndepth -= 1
+        if self._txndepth == 0:
+            if self._txnend > self._txnbegin:
+                self._recalcheader(self._txnbegin, self._txnend - self._txnbegin)
+            self._locker = self._shm
+            self._shm.unlock()
+
+    def _checkrange(self, byteoffset:int, bytecount:int):
+        if byteoffset < 0 or bytecount < 0 or byteoffset + bytecount > self._countbytes:
+            raise IndexError("Memory index out of range")
+
+    def _countwrite(self, same:bool)->bool:
+        # Counts write checked by write suppression, returns `same` (write must be skipped)
+        self._writecount += 1
+        if same:
+            self._suppresscount += 1
+        return same
+
+    def _writebytes(self, byteoffset:int, data):
+        # Writes `data` at `byteoffset` (range is checked by caller) with single lock
+        # and marks it as changed unless the write is suppressed
+        end = byteoffset + len(data)
+        self._locker.lock()
+        if not (self._suppress and self._countwrite(self._mem[byteoffset:end] == data)):
+            self._mem [byteoffset:end] = data
+            self._mask[byteoffset:end] = b'\xFF' * (end - byteoffset)
+            self._recalcheader(byteoffset, end - byteoffset)
+        self._locker.unlock()
+
+    def _mergebits(self, byteoffset:int, bytecount:int, bits:int, value:int):
+        # Merges `value` bits selected by `bits` mask (both are aligned to `byteoffset`)
+        # into memory bytes with single copy and marks only written bits as changed
+        # unless the write is suppressed. Memory must be locked by caller
+        end = byteoffset + bytecount
+        mem = int.from_bytes(self._mem[byteoffset:end], byteorder=MB_BYTEORDER_DEFAULT)
+        if self._suppress and self._countwrite(mem & bits == value):
+            return
+        self._mem[byteoffset:end] = ((mem & ~bits) | value).to_bytes(bytecount, byteorder=MB_BYTEORDER_DEFAULT)
+        mask = int.from_bytes(self._mask[byteoffset:end], byteorder=MB_BYTEORDER_DEFAULT)
+        self._mask[byteoffset:end] = (mask | bits).to_bytes(bytecount, byteorder=MB_BYTEORDER_DEFAULT)
+        self._recalcheader(byteoffset, bytecount)
+
+    def _getnumpyorder(self, size:int):
+        # Returns numpy byte order character or `None` if data order can't be
+        # represented by plain numpy dtype (mixed register/byte order)
+        perm = self._byteperm[size]
+        if perm == tuple(range(size)):
+            return '<'
+        if perm == tuple(range(size-1, -1, -1)):
+            return '>'
+        return None
+
+    def _checknumpy(self):
+        if numpy is None:
+            raise RuntimeError("NumPy is required for array access to device memory")
+
+    def _getnumpytype(self, datatype:str):
+        self._checknumpy()
+        t = MB_DATATYPES.get(datatype)
+        if t is None or t[0] < 2:
+            raise ValueError(f"Unsupported data type for array access: '{datatype}'")
+        return t
+
+    def _getdatatype(self, datatype:str):
+        t = MB_DATATYPES.get(datatype)
+        if t is None:
+            raise ValueError(f"Unsupported data type: '{datatype}'")
+        return t
+
+    def _decodevalues(self, data, size:int, fmt:str, count:int)->list:
+        # Reorder bytes of all values at once with one slice assignment per byte position
+        perm = self._byteperm[size]
+        if perm != tuple(range(size)):
+            buf = bytearray(len(data))
+            for i, p in enumerate(perm):
+                buf[i::size] = data[p::size]
+            data = buf
+        return list(struct.unpack(f'<{count}{fmt}', data))
+
+    def _encodevalues(self, values, size:int, fmt:str)->bytes:
+        # Integers are truncated to the width of the type like single `set<type>()` functions do
+        if fmt not in 'fd':
+            mask = (1 << (size * 8)) - 1
+            values = [_index(v) & mask for v in values]
+            fmt = fmt.upper()
+        data = struct.pack(f'<{len(values)}{fmt}', *values)
+        perm = self._byteperm[size]
+        if perm != tuple(range(size)):
+            buf = bytearray(len(data))
+            for i, p in enumerate(perm):
+                buf[p::size] = data[i::size]
+            data = bytes(buf)
+        return data
+
     def swap32(self, ba:bytearray)->bytearray:
         # Split into 2 16-bit (2-byte) regs
         regs = [ba[i:i+2] for i in range(0, 4, 2)]  # R0, R1, R2, R3
@@ -216,6 +649,192 @@ class _MemoryBlock:
         """
         return self._registerorder
 
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager that locks memory of the current object for a group of operations.
+
+        Shared memory is locked once at the beginning of `with`-block and all get/set
+        operations inside of it do not lock memory again. Change counter and changed
+        range of memory header are updated once at the end of the block, so Modbus Server
+        app takes all changes made within the block at once.
+        Transactions can be nested.
+
+        Example:
+            with mem4x.transaction():
+                mem4x.setfloat(0, 1.5)
+                mem4x.setuint16(2, mem4x.getuint16(3) + 1)
+
+        Note:
+            Modbus Server app can't synchronize memory of the current object until the end
+            of the block, so the block must be short.
+        """
+        ## @cond
+        self._begintransaction()
+        try:
+            yield self
+        finally:
+            self._endtransaction()
+        ## @endcond
+
+    def setwritesuppression(self, enabled:bool):
+        """
+        Turn write suppression of the current memory object on/off (off by default).
+
+        When write suppression is on every set function compares new value with current
+        contents of shared memory and does nothing (no change mask, no change counter,
+        no changed range update) if the value is the same, so Modbus Server app doesn't
+        process rewritten values which were not changed.
+
+        Note:
+            `commitarray()` always marks the range as changed.
+        """
+        self._suppress = bool(enabled)
+
+    def getwritesuppression(self)->bool:
+        """Return `True` if write suppression of the current memory object is on."""
+        return self._suppress
+
+    def getwritestats(self)->tuple:
+        """
+        Return statistics of write suppression as tuple `(writes, suppressed)`.
+
+        `writes` is count of writes checked while write suppression is on and
+        `suppressed` is count of them which were skipped because value was not changed.
+        """
+        return (self._writecount, self._suppresscount)
+
+    def resetwritestats(self):
+        """Reset counters returned by `getwritestats()`."""
+        self._writecount = 0
+        self._suppresscount = 0
+
+    def getmemoryview(self)->memoryview:
+        """
+        Return read-only `memoryview` over the device memory of the current object.
+
+        View is created once and refers directly to the shared memory segment,
+        so slicing, `struct.unpack_from()` and `memoryview.cast('H')` work without
+        copying data. Memory must be changed using `set...()` functions which
+        also update change mask and memory header.
+
+        Returns:
+            Read-only `memoryview` of unsigned bytes (format `'B'`).
+
+        Note:
+            View is not synchronized with Modbus Server app, so multibyte values
+            can be read while they are being updated.
+        """
+        return self._memro
+
+    def getmaskview(self)->memoryview:
+        """
+        Return read-only `memoryview` over the change mask of the current object.
+
+        Mask has the same size as device memory. Bit set to 1 means that
+        corresponding memory bit was changed by the script but not yet
+        synchronized with Modbus Server app.
+
+        Returns:
+            Read-only `memoryview` of unsigned bytes (format `'B'`).
+
+        See Also:
+            getmemoryview()
+        """
+        return self._maskro
+
+    def changed_since(self, token:int=None)->tuple:
+        """
+        Return ranges of memory changed by Modbus Server app (e.g. written by Modbus client) since `token`.
+
+        Modbus Server app increments change counter of memory object every time
+        it copies changed device memory into script memory and stamps every changed
+        memory page with the new counter value. Changes made by the script itself are not reported.
+
+        Args:
+            token  Value returned by the previous call or `None` to get the whole memory.
+
+        Returns:
+            Tuple `(new_token, ranges)` where `ranges` is a list of `(offset, count)` tuples
+            in memory units (bits for `mem0x`/`mem1x`, registers for `mem3x`/`mem4x`).
+            Ranges are page granular, so they may contain unchanged values at the edges.
+
+        Example:
+            token, ranges = mem4x.changed_since(None)
+            ...
+            token, ranges = mem4x.changed_since(token)
+            for offset, count in ranges:
+                process(mem4x.getuint16s(offset, count))
+
+        Note:
+            Raises `RuntimeError` if change tracking is not supported by Modbus Server app.
+        """
+        ## @cond
+        if self._stamps is None:
+            raise RuntimeError("Change tracking is not supported by Modbus Server app")
+        self._locker.lock()
+        current = self._head.serverChangeCounter
+        stamps = self._stamps.tolist() if token != current else None
+        self._locker.unlock()
+        if token is None:
+            return current, [(0, self._count)] if self._count else []
+        if stamps is None:
+            return current, []
+        delta = (current - token) & 0xFFFFFFFF
+        shift = self._dirtyshift
+        ranges = []
+        first = -1
+        for p, stamp in enumerate(stamps):
+            if 0 < ((stamp - token) & 0xFFFFFFFF) <= delta:
+                if first < 0:
+                    first = p
+            elif first >= 0:
+                ranges.append(self._pagestorange(first << shift, p << shift))
+                first = -1
+        if first >= 0:
+            ranges.append(self._pagestorange(first << shift, len(stamps) << shift))
+        return current, ranges
+        ## @endcond
+
+    async def changed(self, where=None)->list:
+        """
+        Coroutine that waits until Modbus Server app changes memory within `where`.
+
+        Changes are polled by `changed_since()` every `MB_CHANGEPOLL` seconds,
+        so other asyncio tasks run while waiting.
+
+        Args:
+            where  `range` of memory units, `(offset, count)` tuple, `modbus.AddressRange`
+                   or `None` for the whole memory.
+
+        Returns:
+            List of changed `(offset, count)` ranges clipped by `where`.
+
+        Example:
+            ranges = await mem4x.changed(range(100, 200))
+        """
+        ## @cond
+        if where is None:
+            lo, hi = 0, self._count
+        elif isinstance(where, range):
+            lo, hi = where.start, where.stop
+        elif isinstance(where, modbus.AddressRange):
+            if where.type() != self._id:
+                raise ValueError("Address range doesn't belong to the current memory object")
+            lo = where.offset()
+            hi = lo + where.count()
+        else:
+            lo, count = where
+            hi = lo + count
+        token, ranges = self.changed_since(None)
+        while True:
+            await asyncio.sleep(MB_CHANGEPOLL)
+            token, ranges = self.changed_since(token)
+            res = [(max(o, lo), min(o + c, hi) - max(o, lo)) for o, c in ranges if o < hi and o + c > lo]
+            if res:
+                return res
+        ## @endcond
+
     def getbytes(self, byteoffset:int, bytecount:int)->bytes:
         """Function returns `bytes` object from device memory  starting with `byteoffset` and `bytecount` bytes.
 
@@ -270,13 +889,9 @@ class _MemoryBlock:
                 c = self._countbytes - byteoffset
             else:
                 c = count
-            if not isinstance(value, bytes):
+            if not isinstance(value, (bytes, bytearray, memoryview)):
                 value = bytes(value)
-            self._shm.lock()
-            memmove(self._pmembytes[byteoffset], value, c)
-            memset(self._pmaskbytes[byteoffset], -1, c)
-            self._recalcheader(byteoffset, c)
-            self._shm.unlock()
+            self._writebytes(byteoffset, value[:c] if c < count else value)
         ## @endcond
 
     def getbitbytearray(self, bitoffset:int, bitcount:int)->bytearray:
@@ -295,29 +910,19 @@ class _MemoryBlock:
         See Also:
             getbitbytes()
         """
-        byteoffset = bitoffset // 8
-        rbyteoffset = (bitoffset+bitcount-1) // 8
-        bytecount = rbyteoffset-byteoffset+1
-        byarray = self._getbytes(byteoffset, bytecount, bytearray)
+        ## @cond
+        if bitcount <= 0:
+            return bytearray()
         shift = bitoffset % 8
-        rem = bitcount % 8
-        ri = (bitcount-1) // 8
-        if shift:
-            c = len(byarray)-1
-            for i in range(c):
-                b1 = byarray[i]
-                b2 = byarray[i+1]   
-                b = ((b2 << (8-shift)) | (b1 >> shift)) & 0xFF
-                byarray[i] = b
-        if rem:
-            mask = (1 << (rem-1))
-            mask |= (mask-1)
-            b = byarray[ri]
-            b = (b >> shift) & mask
-            byarray[ri] = b
-        if len(byarray) > ri+1:
-            del byarray[ri+1]
-        return byarray
+        byteoffset = bitoffset // 8
+        bytecount = (shift + bitcount + 7) // 8
+        if shift == 0 and (bitcount % 8) == 0:
+            return self._getbytes(byteoffset, bytecount, bytearray)
+        # Whole span is shifted and masked as single integer
+        v = int.from_bytes(self._getbytes(byteoffset, bytecount, bytes), byteorder=MB_BYTEORDER_DEFAULT) >> shift
+        v &= (1 << bitcount) - 1
+        return bytearray(v.to_bytes((bitcount + 7) // 8, byteorder=MB_BYTEORDER_DEFAULT))
+        ## @endcond
 
     def getbitbytes(self, bitoffset:int, bitcount:int)->bytes:
         """
@@ -347,44 +952,24 @@ class _MemoryBlock:
             bitcount   Count of bits to write from `value`.
             value      Array of bytes that contains bits to write.
         """
+        ## @cond
         byteoffset = bitoffset // 8
-        rbyteoffset = (bitoffset+bitcount-1) // 8
-        bytecount = rbyteoffset-byteoffset+1
-        byarray = self._getbytes(byteoffset, bytecount, bytearray)
+        if bitcount <= 0 or not (0 <= byteoffset < self._countbytes):
+            return
         shift = bitoffset % 8
-        c = bitcount // 8
-        rem = bitcount % 8
-        if shift:
-            mask = 0xFF << shift
-            notmask = ~mask
-            for i in range(c):
-                v = value[i] << shift
-                b = int.from_bytes([byarray[i], byarray[i+1]], byteorder=MB_BYTEORDER_DEFAULT)
-                b &= notmask
-                b |= v
-                tb = b.to_bytes(2, byteorder=MB_BYTEORDER_DEFAULT)
-                byarray[i]   = tb[0]
-                byarray[i+1] = tb[1]
-        elif c > 0:
-            byarray[0:c] = value[0:c]
-        if rem:
-            mask = (1 << (rem-1))
-            mask |= (mask-1)
-            mask = mask << shift
-            notmask = ~mask
-            v = (value[c] << shift) & mask
-            if shift+rem > 8:
-                b = int.from_bytes([byarray[c], byarray[c+1]], byteorder=MB_BYTEORDER_DEFAULT)
-                b &= notmask
-                b |= v
-                tb = b.to_bytes(2, byteorder=MB_BYTEORDER_DEFAULT)
-                byarray[c]   = tb[0]
-                byarray[c+1] = tb[1]
-            else:
-                b = byarray[c] & notmask
-                b |= v
-                byarray[c] = b
-        self.setbytes(byteoffset, bytes(byarray))
+        bytecount = (shift + bitcount + 7) // 8
+        if byteoffset + bytecount > self._countbytes:
+            bytecount = self._countbytes - byteoffset
+            bitcount = bytecount * 8 - shift
+        if shift == 0 and (bitcount % 8) == 0:
+            self.setbytes(byteoffset, value[:bytecount])
+            return
+        bits = ((1 << bitcount) - 1) << shift
+        v = (int.from_bytes(value, byteorder=MB_BYTEORDER_DEFAULT) << shift) & bits
+        self._locker.lock()
+        self._mergebits(byteoffset, bytecount, bits, v)
+        self._locker.unlock()
+        ## @endcond
 
     def getbit(self, bitoffset:int)->bool:
         """
@@ -404,9 +989,9 @@ class _MemoryBlock:
         ## @cond
         byteoffset = bitoffset // 8
         if 0 <= byteoffset < self._countbytes:
-            self._shm.lock()
-            vbyte = self._pmembytes[byteoffset][0]
-            self._shm.unlock()
+            self._locker.lock()
+            vbyte = self._mem[byteoffset]
+            self._locker.unlock()
             return (vbyte & (1 << bitoffset % 8)) != 0
         return False
         ## @endcond
@@ -427,14 +1012,17 @@ class _MemoryBlock:
         ## @cond
         byteoffset = bitoffset // 8
         if 0 <= byteoffset < self._countbytes:
-            self._shm.lock()
+            self._locker.lock()
+            if self._suppress and self._countwrite(bool(self._mem[byteoffset] & (1 << (bitoffset % 8))) == bool(value)):
+                self._locker.unlock()
+                return
             if value:
-                self._pmembytes[byteoffset][0] |= (1 << (bitoffset % 8))
+                self._mem[byteoffset] |= (1 << (bitoffset % 8))
             else:
-                self._pmembytes[byteoffset][0] &= ~(1 << (bitoffset % 8))
-            self._pmaskbytes[byteoffset][0] |= (1 << bitoffset % 8)
+                self._mem[byteoffset] &= ~(1 << (bitoffset % 8))
+            self._mask[byteoffset] |= (1 << bitoffset % 8)
             self._recalcheader(byteoffset, 1)
-            self._shm.unlock()
+            self._locker.unlock()
         ## @endcond
 
     def getbitstring(self, bitoffset:int, bytecount:int)->str:
@@ -573,27 +1161,75 @@ class _MemoryBlockBits(_MemoryBlock):
         super().__init__(shmid, (count+7)//8, id, byteorder, regorder)
         c = self._countbytes * 8
         self._count = count if count <= c else c
+        self._unitbits = 1
     ## @endcond
 
-    def __getitem__(self, index:int)->int:
+    def __getitem__(self, index):
         """
         Return bit value at `index`.
 
         Same as `getbit()` but raises `IndexError` if out of range.
-        """
+        If `index` is a slice (e.g. `mem0x[10:200]`, step is allowed)
+        returns list of `bool` values read with single lock and single memory copy.
+        """
+        if isinstance(index, slice):
+            ## @cond
+            r = range(*index.indices(self._count))
+            if not r:
+                return []
+            lo = min(r[0], r[-1])
+            n = abs(r[-1] - r[0]) + 1
+            v = int.from_bytes(self.getbitbytes(lo, n), byteorder=MB_BYTEORDER_DEFAULT)
+            s = format(v, f'0{n}b')[::-1]
+            return [c == '1' for c in s[r[0]-lo::r.step]]
+            ## @endcond
         if index < 0 or index >= self._count:
             raise IndexError("Memory index out of range")
         return self.getbit(index)
     
-    def __setitem__(self, index:int, value:int):
+    def __setitem__(self, index, value):
         """
         Set bit value at `index`.
 
         Same as `setbit()` but raises `IndexError` if out of range.
-        """
+        If `index` is a slice `value` must be sequence of the same length as slice.
+        Values are written with single lock and single memory header update.
+        """
+        if isinstance(index, slice):
+            ## @cond
+            r = range(*index.indices(self._count))
+            values = list(value)
+            if len(values) != len(r):
+                raise ValueError(f"Attempt to assign sequence of size {len(values)} to slice of size {len(r)}")
+            if not r:
+                return
+            if r.step == 1:
+                v = 0
+                for i, b in enumerate(values):
+                    if b:
+                        v |= 1 << i
+                n = len(r)
+                self.setbitbytes(r[0], n, v.to_bytes((n + 7) // 8, byteorder=MB_BYTEORDER_DEFAULT))
+            else:
+                with self.transaction():
+                    for i, b in zip(r, values):
+                        self.setbit(i, b)
+            return
+            ## @endcond
         if index < 0 or index >= self._count:
             raise IndexError("Memory index out of range")
         self.setbit(index, value)
+
+    def __len__(self)->int:
+        """Return count of bits of the memory."""
+        return self._count
+
+    def __iter__(self):
+        """Iterate over all bit values of the memory reading `MB_ITERCHUNK_SIZE` bits with single lock."""
+        ## @cond
+        for i in range(0, self._count, MB_ITERCHUNK_SIZE):
+            yield from self[i:i+MB_ITERCHUNK_SIZE]
+        ## @endcond
     
     def getint8(self, bitoffset:int)->int:
         """
@@ -606,8 +1242,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [-128:127], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-7:
-            b = self.getbitbytearray(bitoffset, 8)
-            return int.from_bytes(b, byteorder=self._byteorder, signed=True)
+            return self._codecs['int8'].unpack(self.getbitbytes(bitoffset, 8))[0]
         return 0
     
     def setint8(self, bitoffset:int, value:int):
@@ -622,8 +1257,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-7:
-            b = value.to_bytes(1, self._byteorder, signed=True)
-            self.setbitbytes(bitoffset, 8, b)
+            self.setbitbytes(bitoffset, 8, self._codecs['uint8'].pack(value & 0xFF))
 
     def getuint8(self, bitoffset:int)->int:
         """
@@ -636,8 +1270,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [0:255], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-7:
-            b = self.getbitbytearray(bitoffset, 8)
-            return int.from_bytes(b, byteorder=self._byteorder, signed=False)
+            return self._codecs['uint8'].unpack(self.getbitbytes(bitoffset, 8))[0]
         return 0
     
     def setuint8(self, bitoffset:int, value:int):
@@ -652,8 +1285,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-7:
-            b = value.to_bytes(1, self._byteorder, signed=False)
-            self.setbitbytes(bitoffset, 8, b)
+            self.setbitbytes(bitoffset, 8, self._codecs['uint8'].pack(value & 0xFF))
 
     def getint16(self, bitoffset:int)->int:
         """
@@ -666,8 +1298,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [-32768:32767], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-15:
-            b = self.getbitbytearray(bitoffset, 16)
-            return int.from_bytes(b, byteorder=self._byteorder, signed=True)
+            return self._codecs['int16'].unpack(self.getbitbytes(bitoffset, 16))[0]
         return 0
     
     def setint16(self, bitoffset:int, value:int):
@@ -682,8 +1313,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-15:
-            b = value.to_bytes(2, self._byteorder, signed=True)
-            self.setbitbytes(bitoffset, 16, b)
+            self.setbitbytes(bitoffset, 16, self._codecs['uint16'].pack(value & 0xFFFF))
 
     def getuint16(self, bitoffset:int)->int:
         """
@@ -696,8 +1326,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [0:65535], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-15:
-            b = self.getbitbytearray(bitoffset, 16)
-            return int.from_bytes(b, byteorder=self._byteorder, signed=False)
+            return self._codecs['uint16'].unpack(self.getbitbytes(bitoffset, 16))[0]
         return 0
     
     def setuint16(self, bitoffset:int, value:int):
@@ -712,8 +1341,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-15:
-            b = value.to_bytes(2, self._byteorder, signed=False)
-            self.setbitbytes(bitoffset, 16, b)
+            self.setbitbytes(bitoffset, 16, self._codecs['uint16'].pack(value & 0xFFFF))
 
     def getint32(self, bitoffset:int)->int:
         """
@@ -726,8 +1354,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [-2147483648:2147483647], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-31:
-            b = self.swap32(self.getbitbytearray(bitoffset, 32))
-            return int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=True)
+            return self._codecs['int32'].unpack(self.getbitbytes(bitoffset, 32))[0]
         return 0
     
     def setint32(self, bitoffset:int, value:int):
@@ -742,8 +1369,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-31:
-            b = self.swap32(value.to_bytes(4, MB_BYTEORDER_DEFAULT, signed=True))
-            self.setbitbytes(bitoffset, 32, b)
+            self.setbitbytes(bitoffset, 32, self._codecs['uint32'].pack(value & 0xFFFFFFFF))
 
     def getuint32(self, bitoffset:int)->int:
         """
@@ -756,8 +1382,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [0:4294967295], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-31:
-            b = self.swap32(self.getbitbytearray(bitoffset, 32))
-            return int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=False)
+            return self._codecs['uint32'].unpack(self.getbitbytes(bitoffset, 32))[0]
         return 0
     
     def setuint32(self, bitoffset:int, value:int):
@@ -772,8 +1397,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-31:
-            b = self.swap32(value.to_bytes(4, MB_BYTEORDER_DEFAULT, signed=False))
-            self.setbitbytes(bitoffset, 32, b)
+            self.setbitbytes(bitoffset, 32, self._codecs['uint32'].pack(value & 0xFFFFFFFF))
 
     def getint64(self, bitoffset:int)->int:
         """
@@ -786,8 +1410,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [-9223372036854775808:9223372036854775807], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-63:
-            b = self.swap64(self.getbitbytearray(bitoffset, 64))
-            return int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=True)
+            return self._codecs['int64'].unpack(self.getbitbytes(bitoffset, 64))[0]
         return 0
     
     def setint64(self, bitoffset:int, value:int):
@@ -802,8 +1425,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-63:
-            b = self.swap64(value.to_bytes(8, MB_BYTEORDER_DEFAULT, signed=True))
-            self.setbitbytes(bitoffset, 64, b)
+            self.setbitbytes(bitoffset, 64, self._codecs['uint64'].pack(value & 0xFFFFFFFFFFFFFFFF))
 
     def getuint64(self, bitoffset:int)->int:
         """
@@ -816,8 +1438,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Integer in range [0:18446744073709551615], or 0 if out of range.
         """
         if 0 <= bitoffset < self._count-63:
-            b = self.swap64(self.getbitbytearray(bitoffset, 64))
-            return int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=False)
+            return self._codecs['uint64'].unpack(self.getbitbytes(bitoffset, 64))[0]
         return 0
     
     def setuint64(self, bitoffset:int, value:int):
@@ -832,8 +1453,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-63:
-            b = self.swap64(value.to_bytes(8, MB_BYTEORDER_DEFAULT, signed=False))
-            self.setbitbytes(bitoffset, 64, b)
+            self.setbitbytes(bitoffset, 64, self._codecs['uint64'].pack(value & 0xFFFFFFFFFFFFFFFF))
 
     def getfloat(self, bitoffset:int)->float:
         """
@@ -846,8 +1466,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Float value, or 0.0 if out of range.
         """
         if 0 <= bitoffset < self._count-31:
-            b = self.swap32(self.getbitbytearray(bitoffset, 32))
-            return struct.unpack('<f', b)[0]
+            return self._codecs['float'].unpack(self.getbitbytes(bitoffset, 32))[0]
         return 0.0
     
     def setfloat(self, bitoffset:int, value:float):
@@ -862,8 +1481,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-31:
-            b = self.swap32(struct.pack('<f', value))
-            self.setbitbytes(bitoffset, 32, b)
+            self.setbitbytes(bitoffset, 32, self._codecs['float'].pack(value))
 
     def getdouble(self, bitoffset:int)->float:
         """
@@ -876,8 +1494,7 @@ class _MemoryBlockBits(_MemoryBlock):
             Float value, or 0.0 if out of range.
         """
         if 0 <= bitoffset < self._count-63:
-            b = self.swap64(self.getbitbytearray(bitoffset, 64))
-            return struct.unpack('<d', b)[0]
+            return self._codecs['double'].unpack(self.getbitbytes(bitoffset, 64))[0]
         return 0.0
     
     def setdouble(self, bitoffset:int, value:float):
@@ -892,8 +1509,277 @@ class _MemoryBlockBits(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= bitoffset < self._count-63:
-            b = self.swap64(struct.pack('<d', value))
-            self.setbitbytes(bitoffset, 64, b)
+            self.setbitbytes(bitoffset, 64, self._codecs['double'].pack(value))
+
+    def getvalues(self, datatype:str, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` values of `datatype` from bit memory starting at `bitoffset`.
+
+        Bits of all values are read with single lock and single memory copy,
+        byte and register order is applied to all values at once.
+
+        Args:
+            datatype   Data type name: int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double.
+            bitoffset  Bit offset (0-based).
+            count      Count of values to read.
+
+        Returns:
+            List of `int` or `float` values.
+
+        Note:
+            Raises `IndexError` if range is out of memory.
+        """
+        ## @cond
+        size, fmt = self._getdatatype(datatype)
+        bitcount = count * size * 8
+        if bitoffset < 0 or count < 0 or bitoffset + bitcount > self._count:
+            raise IndexError("Memory index out of range")
+        if count == 0:
+            return []
+        return self._decodevalues(self.getbitbytes(bitoffset, bitcount), size, fmt, count)
+        ## @endcond
+
+    def setvalues(self, datatype:str, bitoffset:int, values):
+        """
+        Write sequence of `datatype` values into bit memory starting at `bitoffset`.
+
+        All values are written with single memory copy and single memory header update.
+
+        Args:
+            datatype   Data type name: int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double.
+            bitoffset  Bit offset (0-based).
+            values     Sequence of `int` or `float` values.
+
+        Note:
+            Raises `IndexError` if range is out of memory.
+            Integers are truncated to the width of `datatype` like `set<datatype>()` does.
+        """
+        ## @cond
+        size, fmt = self._getdatatype(datatype)
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        bitcount = len(values) * size * 8
+        if bitoffset < 0 or bitoffset + bitcount > self._count:
+            raise IndexError("Memory index out of range")
+        if bitcount:
+            self.setbitbytes(bitoffset, bitcount, self._encodevalues(values, size, fmt))
+        ## @endcond
+
+    def getint8s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` int8 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('int8', bitoffset, count)`.
+        """
+        return self.getvalues('int8', bitoffset, count)
+
+    def setint8s(self, bitoffset:int, values):
+        """
+        Write sequence of int8 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('int8', bitoffset, values)`.
+        """
+        self.setvalues('int8', bitoffset, values)
+
+    def getuint8s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` uint8 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('uint8', bitoffset, count)`.
+        """
+        return self.getvalues('uint8', bitoffset, count)
+
+    def setuint8s(self, bitoffset:int, values):
+        """
+        Write sequence of uint8 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('uint8', bitoffset, values)`.
+        """
+        self.setvalues('uint8', bitoffset, values)
+
+    def getint16s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` int16 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('int16', bitoffset, count)`.
+        """
+        return self.getvalues('int16', bitoffset, count)
+
+    def setint16s(self, bitoffset:int, values):
+        """
+        Write sequence of int16 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('int16', bitoffset, values)`.
+        """
+        self.setvalues('int16', bitoffset, values)
+
+    def getuint16s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` uint16 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('uint16', bitoffset, count)`.
+        """
+        return self.getvalues('uint16', bitoffset, count)
+
+    def setuint16s(self, bitoffset:int, values):
+        """
+        Write sequence of uint16 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('uint16', bitoffset, values)`.
+        """
+        self.setvalues('uint16', bitoffset, values)
+
+    def getint32s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` int32 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('int32', bitoffset, count)`.
+        """
+        return self.getvalues('int32', bitoffset, count)
+
+    def setint32s(self, bitoffset:int, values):
+        """
+        Write sequence of int32 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('int32', bitoffset, values)`.
+        """
+        self.setvalues('int32', bitoffset, values)
+
+    def getuint32s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` uint32 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('uint32', bitoffset, count)`.
+        """
+        return self.getvalues('uint32', bitoffset, count)
+
+    def setuint32s(self, bitoffset:int, values):
+        """
+        Write sequence of uint32 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('uint32', bitoffset, values)`.
+        """
+        self.setvalues('uint32', bitoffset, values)
+
+    def getint64s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` int64 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('int64', bitoffset, count)`.
+        """
+        return self.getvalues('int64', bitoffset, count)
+
+    def setint64s(self, bitoffset:int, values):
+        """
+        Write sequence of int64 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('int64', bitoffset, values)`.
+        """
+        self.setvalues('int64', bitoffset, values)
+
+    def getuint64s(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` uint64 values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('uint64', bitoffset, count)`.
+        """
+        return self.getvalues('uint64', bitoffset, count)
+
+    def setuint64s(self, bitoffset:int, values):
+        """
+        Write sequence of uint64 values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('uint64', bitoffset, values)`.
+        """
+        self.setvalues('uint64', bitoffset, values)
+
+    def getfloats(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` 32-bit float values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('float', bitoffset, count)`.
+        """
+        return self.getvalues('float', bitoffset, count)
+
+    def setfloats(self, bitoffset:int, values):
+        """
+        Write sequence of 32-bit float values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('float', bitoffset, values)`.
+        """
+        self.setvalues('float', bitoffset, values)
+
+    def getdoubles(self, bitoffset:int, count:int)->list:
+        """
+        Return list of `count` 64-bit float values from bit memory starting at `bitoffset`.
+
+        Same as `getvalues('double', bitoffset, count)`.
+        """
+        return self.getvalues('double', bitoffset, count)
+
+    def setdoubles(self, bitoffset:int, values):
+        """
+        Write sequence of 64-bit float values into bit memory starting at `bitoffset`.
+
+        Same as `setvalues('double', bitoffset, values)`.
+        """
+        self.setvalues('double', bitoffset, values)
+
+    def getbits(self, bitoffset:int, count:int):
+        """
+        Return NumPy `bool` array of `count` bits starting at `bitoffset`.
+
+        Bits are unpacked from shared memory with single `numpy.unpackbits()` call
+        (`bitorder='little'`), so array element `i` is bit `bitoffset+i`.
+        Returned array is a copy of the memory.
+
+        Args:
+            bitoffset  Offset of the first bit (0-based).
+            count      Count of bits to read.
+
+        Returns:
+            `numpy.ndarray` of `bool`.
+
+        Note:
+            Requires NumPy. Raises `IndexError` if range is out of memory.
+        """
+        ## @cond
+        self._checknumpy()
+        if bitoffset < 0 or count < 0 or bitoffset + count > self._count:
+            raise IndexError("Memory index out of range")
+        shift = bitoffset % 8
+        byteoffset = bitoffset // 8
+        bytecount = (shift + count + 7) // 8
+        self._locker.lock()
+        raw = numpy.frombuffer(self._mem, dtype=numpy.uint8, count=bytecount, offset=byteoffset)
+        bits = numpy.unpackbits(raw, bitorder='little')
+        self._locker.unlock()
+        return bits[shift:shift+count].view(numpy.bool_)
+        ## @endcond
+
+    def setbits(self, bitoffset:int, values):
+        """
+        Write sequence or NumPy array of bits starting at `bitoffset`.
+
+        Values are packed with single `numpy.packbits()` call (`bitorder='little'`)
+        and written under single lock. Only written bits are marked as changed.
+
+        Args:
+            bitoffset  Offset of the first bit (0-based).
+            values     Sequence or `numpy.ndarray` of bit values (converted to `bool`).
+
+        Note:
+            Requires NumPy. Raises `IndexError` if range is out of memory.
+        """
+        ## @cond
+        self._checknumpy()
+        data = numpy.asarray(values, dtype=numpy.bool_).reshape(-1)
+        count = data.shape[0]
+        if bitoffset < 0 or bitoffset + count > self._count:
+            raise IndexError("Memory index out of range")
+        if count:
+            self.setbitbytes(bitoffset, count, numpy.packbits(data, bitorder='little').tobytes())
+        ## @endcond
 
     def getstring(self, bitoffset:int, bytecount:int)->str:
         """
@@ -930,29 +1816,112 @@ class _MemoryBlockRegs(_MemoryBlock):
         super().__init__(shmid, count*2, id, byteorder, regorder)
         c = self._countbytes // 2
         self._count = count if count <= c else c
-        self._pmem = cast(self._pmembytes,POINTER(c_ushort*1))
-        self._pmask = cast(self._pmaskbytes,POINTER(c_ushort*1))
+        self._unitbits = 16
+        self._formatcached = lru_cache(maxsize=MB_FORMATCACHE_SIZE)(self._makeformat)
+
+    def _makeformat(self, fmt:str):
+        # Compiles `struct` format (without byte order character) into converter
+        # which applies byte/register order of the memory to every numeric value.
+        # Byte pairs of strings (`s`, `p`) are swapped for big-endian memory like `getregstring()` does
+        if fmt[:1] in ('<', '>', '=', '!', '@'):
+            raise ValueError(f"Byte order character is not allowed in format: '{fmt}'")
+        try:
+            struct.calcsize('<'+fmt)
+        except struct.error as e:
+            raise ValueError(f"Invalid format '{fmt}': {e}") from None
+        perm = []
+        orders = set()
+        offset = 0
+        swapstrings = False
+        for count, code in re.findall(r'(\d*)([^\s\d])', fmt):
+            count = int(count) if count else 1
+            size = struct.calcsize('<'+code)
+            if code in 'sp' and self._byteorder == 'big':
+                for i in range(count):
+                    perm.append(offset + (i ^ 1) if (i ^ 1) < count else offset + i)
+                offset += count
+                swapstrings = swapstrings or count > 1
+            elif code in 'spx' or size == 1:
+                perm.extend(range(offset, offset + count*size))
+                offset += count*size
+            else:
+                p = self._byteperm[size]
+                orders.add(self._getnumpyorder(size))
+                for _ in range(count):
+                    perm.extend(offset + i for i in p)
+                    offset += size
+        if orders <= {'<'} and not swapstrings:
+            return struct.Struct('<'+fmt)
+        if orders == {'>'} and not swapstrings:
+            return struct.Struct('>'+fmt)
+        return _MbPermStruct(fmt, tuple(perm))
     ## @endcond
 
-    def __getitem__(self, index:int)->int:
+    def __getitem__(self, index):
         """
         Return uint16 register at `index`.
 
         Same as `getuint16()` but raises `IndexError` if out of range.
-        """
+        If `index` is a slice (e.g. `mem4x[10:200]`, step is allowed)
+        returns `array('H')` of registers read with single lock and single memory copy.
+        """
+        if isinstance(index, slice):
+            ## @cond
+            a = array('H')
+            self._locker.lock()
+            a.frombytes(self._mem[:self._count*2].cast('H')[index].tobytes())
+            self._locker.unlock()
+            if self._byteorder != sys.byteorder:
+                a.byteswap()
+            return a
+            ## @endcond
         if index < 0 or index >= self._count:
             raise IndexError("Memory index out of range")
         return self.getuint16(index)
     
-    def __setitem__(self, index:int, value:int)->int:
+    def __setitem__(self, index, value)->int:
         """
         Set uint16 register at `index`.
 
         Same as `setuint16()` but raises `IndexError` if out of range.
-        """
+        If `index` is a slice `value` must be sequence of the same length as slice.
+        Registers are written with single lock and single memory header update.
+        """
+        if isinstance(index, slice):
+            ## @cond
+            r = range(*index.indices(self._count))
+            a = array('H', [v & 0xFFFF for v in value])
+            if len(a) != len(r):
+                raise ValueError(f"Attempt to assign sequence of size {len(a)} to slice of size {len(r)}")
+            if not r:
+                return
+            if self._byteorder != sys.byteorder:
+                a.byteswap()
+            lo = min(r[0], r[-1])
+            hi = max(r[0], r[-1]) + 1
+            self._locker.lock()
+            regs = self._mem[:self._count*2].cast('H')
+            if not (self._suppress and self._countwrite(regs[index] == a)):
+                regs[index] = a
+                self._mask[:self._count*2].cast('H')[index] = array('H', [0xFFFF]) * len(a)
+                self._recalcheader(lo * 2, (hi - lo) * 2)
+            self._locker.unlock()
+            return
+            ## @endcond
         if index < 0 or index >= self._count:
             raise IndexError("Memory index out of range")
         return self.setuint16(index, value)
+
+    def __len__(self)->int:
+        """Return count of registers of the memory."""
+        return self._count
+
+    def __iter__(self):
+        """Iterate over all uint16 registers of the memory reading `MB_ITERCHUNK_SIZE` registers with single lock."""
+        ## @cond
+        for i in range(0, self._count, MB_ITERCHUNK_SIZE):
+            yield from self[i:i+MB_ITERCHUNK_SIZE]
+        ## @endcond
     
     def getint8(self, regoffset:int)->int:
         """
@@ -970,9 +1939,9 @@ class _MemoryBlockRegs(_MemoryBlock):
         ## @cond
         byteoffset = regoffset * 2
         if 0 <= byteoffset < self._countbytes:
-            self._shm.lock()
-            value = cast(self._pmembytes[byteoffset], POINTER(c_byte))[0]
-            self._shm.unlock()
+            self._locker.lock()
+            value = self._codecs['int8'].unpack_from(self._mem, byteoffset)[0]
+            self._locker.unlock()
             return value
         return 0
         ## @endcond
@@ -1006,9 +1975,9 @@ class _MemoryBlockRegs(_MemoryBlock):
         ## @cond
         byteoffset = regoffset * 2
         if 0 <= byteoffset < self._countbytes:
-            self._shm.lock()
-            r = self._pmembytes[byteoffset][0]
-            self._shm.unlock()
+            self._locker.lock()
+            r = self._mem[byteoffset]
+            self._locker.unlock()
             return r
         return 0
         ## @endcond
@@ -1027,11 +1996,12 @@ class _MemoryBlockRegs(_MemoryBlock):
         ## @cond
         byteoffset = regoffset * 2
         if 0 <= byteoffset < self._countbytes:
-            self._shm.lock()
-            self._pmembytes [byteoffset][0] = value
-            self._pmaskbytes[byteoffset][0] = 0xFF
-            self._recalcheader(byteoffset, 1)
-            self._shm.unlock()
+            self._locker.lock()
+            if not (self._suppress and self._countwrite(self._mem[byteoffset] == value & 0xFF)):
+                self._mem [byteoffset] = value & 0xFF
+                self._mask[byteoffset] = 0xFF
+                self._recalcheader(byteoffset, 1)
+            self._locker.unlock()
         ## @endcond
             
     def getint16(self, offset:int)->int:
@@ -1045,11 +2015,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Integer in range [-32768:32767], or 0 if out of range.
         """
         if 0 <= offset < self._count:
-            self._shm.lock()
-            value = cast(self._pmem[offset], POINTER(c_short))[0]
-            self._shm.unlock()
-            if self._byteorder == 'big':
-                value = struct.unpack('<h', struct.pack('>h', value))[0]
+            self._locker.lock()
+            value = self._codecs['int16'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
 
@@ -1065,13 +2033,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count:
-            if self._byteorder == 'big':
-                value = struct.unpack('<h', struct.pack('>h', value))[0]
-            self._shm.lock()
-            self._pmem [offset][0] = value
-            self._pmask[offset][0] = 0xFFFF
-            self._recalcheader(offset*2, 2)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['uint16'].pack(value & 0xFFFF))
 
     def getuint16(self, offset:int)->int:
         """
@@ -1084,11 +2047,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Integer in range [0:65535], or 0 if out of range.
         """
         if 0 <= offset < self._count:
-            self._shm.lock()
-            value = self._pmem[offset][0]
-            self._shm.unlock()
-            if self._byteorder == 'big':
-                value = struct.unpack('<H', struct.pack('>H', value))[0]
+            self._locker.lock()
+            value = self._codecs['uint16'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
     
@@ -1104,13 +2065,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count:
-            if self._byteorder == 'big':
-                value = struct.unpack('<H', struct.pack('>H', value))[0]
-            self._shm.lock()
-            self._pmem [offset][0] = value
-            self._pmask[offset][0] = 0xFFFF
-            self._recalcheader(offset*2, 2)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['uint16'].pack(value & 0xFFFF))
 
     def getint32(self, offset:int)->int:
         """
@@ -1123,12 +2079,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Integer in range [-2147483648:2147483647], or 0 if out of range.
         """
         if 0 <= offset < self._count-1:
-            self._shm.lock()
-            value = int(cast(self._pmem[offset], POINTER(c_int))[0])
-            self._shm.unlock()
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap32(value.to_bytes(4, MB_BYTEORDER_DEFAULT, signed=True))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=True)
+            self._locker.lock()
+            value = self._codecs['int32'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
 
@@ -1144,14 +2097,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count-1:
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap32(value.to_bytes(4, MB_BYTEORDER_DEFAULT, signed=True))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=True)
-            self._shm.lock()
-            cast(self._pmem [offset], POINTER(c_int))[0] = value
-            cast(self._pmask[offset], POINTER(c_int))[0] = 0xFFFFFFFF
-            self._recalcheader(offset*2, 4)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['uint32'].pack(value & 0xFFFFFFFF))
 
     def getuint32(self, offset:int)->int:
         """
@@ -1164,12 +2111,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Integer in range [0:4294967295], or 0 if out of range.
         """
         if 0 <= offset < self._count-1:
-            self._shm.lock()
-            value = int(cast(self._pmem[offset], POINTER(c_uint))[0])
-            self._shm.unlock()
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap32(value.to_bytes(4, MB_BYTEORDER_DEFAULT, signed=False))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=False)
+            self._locker.lock()
+            value = self._codecs['uint32'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
     
@@ -1185,14 +2129,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count-1:
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap32(value.to_bytes(4, MB_BYTEORDER_DEFAULT, signed=False))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=False)
-            self._shm.lock()
-            cast(self._pmem [offset], POINTER(c_uint))[0] = value
-            cast(self._pmask[offset], POINTER(c_uint))[0] = 0xFFFFFFFF
-            self._recalcheader(offset*2, 4)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['uint32'].pack(value & 0xFFFFFFFF))
 
     def getint64(self, offset:int)->int:
         """
@@ -1205,12 +2143,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Integer in range [-9223372036854775808:9223372036854775807], or 0 if out of range.
         """
         if 0 <= offset < self._count-3:
-            self._shm.lock()
-            value = int(cast(self._pmem[offset], POINTER(c_longlong))[0])
-            self._shm.unlock()
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap64(value.to_bytes(8, MB_BYTEORDER_DEFAULT, signed=True))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=True)
+            self._locker.lock()
+            value = self._codecs['int64'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
 
@@ -1226,14 +2161,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count-3:
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap64(value.to_bytes(8, MB_BYTEORDER_DEFAULT, signed=True))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=True)
-            self._shm.lock()
-            cast(self._pmem [offset], POINTER(c_longlong))[0] = value
-            cast(self._pmask[offset], POINTER(c_longlong))[0] = 0xFFFFFFFFFFFFFFFF
-            self._recalcheader(offset*2, 8)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['uint64'].pack(value & 0xFFFFFFFFFFFFFFFF))
 
     def getuint64(self, offset:int)->int:
         """
@@ -1246,12 +2175,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Integer in range [0:18446744073709551615], or 0 if out of range.
         """
         if 0 <= offset < self._count-3:
-            self._shm.lock()
-            value = int(cast(self._pmem[offset], POINTER(c_ulonglong))[0])
-            self._shm.unlock()
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap64(value.to_bytes(8, MB_BYTEORDER_DEFAULT, signed=False))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=False)
+            self._locker.lock()
+            value = self._codecs['uint64'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
     
@@ -1267,14 +2193,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count-3:
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap64(value.to_bytes(8, MB_BYTEORDER_DEFAULT, signed=False))
-                value = int.from_bytes(b, byteorder=MB_BYTEORDER_DEFAULT, signed=False)
-            self._shm.lock()
-            cast(self._pmem [offset], POINTER(c_ulonglong))[0] = value
-            cast(self._pmask[offset], POINTER(c_ulonglong))[0] = 0xFFFFFFFFFFFFFFFF
-            self._recalcheader(offset*2, 8)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['uint64'].pack(value & 0xFFFFFFFFFFFFFFFF))
 
     def getfloat(self, offset:int)->int:
         """
@@ -1287,12 +2207,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Float value, or 0.0 if out of range.
         """
         if 0 <= offset < self._count-1:
-            self._shm.lock()
-            value = float(cast(self._pmem[offset], POINTER(c_float))[0])
-            self._shm.unlock()
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap32(struct.pack('<f', value))
-                value = struct.unpack('<f', b)[0]
+            self._locker.lock()
+            value = self._codecs['float'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
     
@@ -1308,14 +2225,8 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count-1:
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap32(struct.pack('<f', value))
-                value = struct.unpack('<f', b)[0]
-            self._shm.lock()
-            cast(self._pmem [offset], POINTER(c_float))[0] = value
-            cast(self._pmask[offset], POINTER(c_uint))[0] = 0xFFFFFFFF
-            self._recalcheader(offset*2, 4)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['float'].pack(value))
 
     def getdouble(self, offset:int)->int:
         """
@@ -1328,12 +2239,9 @@ class _MemoryBlockRegs(_MemoryBlock):
             Float value, or 0.0 if out of range.
         """
         if 0 <= offset < self._count-3:
-            self._shm.lock()
-            value = float(cast(self._pmem[offset], POINTER(c_double))[0])
-            self._shm.unlock()
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap64(struct.pack('<d', value))
-                value = struct.unpack('<d', b)[0]
+            self._locker.lock()
+            value = self._codecs['double'].unpack_from(self._mem, offset*2)[0]
+            self._locker.unlock()
             return value
         return 0
     
@@ -1349,14 +2257,336 @@ class _MemoryBlockRegs(_MemoryBlock):
             Does nothing if out of range.
         """
         if 0 <= offset < self._count-3:
-            if not (self._byteorder == MB_BYTEORDER_DEFAULT and self._registerorder == MB_REGISTERORDER_R0R1R2R3):
-                b = self.swap64(struct.pack('<d', value))
-                value = struct.unpack('<d', b)[0]
-            self._shm.lock()
-            cast(self._pmem [offset], POINTER(c_double))[0] = value
-            cast(self._pmask[offset], POINTER(c_ulonglong))[0] = 0xFFFFFFFFFFFFFFFF
-            self._recalcheader(offset*2, 8)
-            self._shm.unlock()
+            byteoffset = offset * 2
+            self._writebytes(byteoffset, self._codecs['double'].pack(value))
+
+    def getvalues(self, datatype:str, offset:int, count:int)->list:
+        """
+        Return list of `count` values of `datatype` from register memory starting at `offset`.
+
+        Values are read with single lock and single memory copy, byte and register
+        order is applied to all values at once.
+        Values of `int8`/`uint8` types occupy one register each (first byte of the register)
+        like `getint8()`/`getuint8()` do.
+
+        Args:
+            datatype  Data type name: int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double.
+            offset    Offset of the first register (0-based).
+            count     Count of values to read.
+
+        Returns:
+            List of `int` or `float` values.
+
+        Note:
+            Raises `IndexError` if range is out of memory.
+        """
+        ## @cond
+        size, fmt = self._getdatatype(datatype)
+        byteoffset = offset * 2
+        bytecount = count * size if size > 1 else count * 2
+        self._checkrange(byteoffset, bytecount)
+        self._locker.lock()
+        if size > 1:
+            data = bytes(self._mem[byteoffset:byteoffset+bytecount])
+        else:
+            data = bytes(self._mem[byteoffset:byteoffset+bytecount:2])
+        self._locker.unlock()
+        return self._decodevalues(data, size, fmt, count)
+        ## @endcond
+
+    def setvalues(self, datatype:str, offset:int, values):
+        """
+        Write sequence of `datatype` values into register memory starting at `offset`.
+
+        Values are written with single lock, single memory copy and single memory header update.
+        Values of `int8`/`uint8` types occupy one register each (first byte of the register)
+        like `setint8()`/`setuint8()` do.
+
+        Args:
+            datatype  Data type name: int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double.
+            offset    Offset of the first register (0-based).
+            values    Sequence of `int` or `float` values.
+
+        Note:
+            Raises `IndexError` if range is out of memory.
+            Integers are truncated to the width of `datatype` like `set<datatype>()` does.
+        """
+        ## @cond
+        size, fmt = self._getdatatype(datatype)
+        if not isinstance(values, (list, tuple)):
+            values = list(values)
+        count = len(values)
+        byteoffset = offset * 2
+        bytecount = count * size if size > 1 else count * 2
+        self._checkrange(byteoffset, bytecount)
+        data = self._encodevalues(values, size, fmt)
+        self._locker.lock()
+        if self._suppress and self._countwrite(self._mem[byteoffset:byteoffset+bytecount:1 if size > 1 else 2] == data):
+            self._locker.unlock()
+            return
+        if size > 1:
+            self._mem [byteoffset:byteoffset+bytecount] = data
+            self._mask[byteoffset:byteoffset+bytecount] = b'\xFF' * bytecount
+        else:
+            self._mem [byteoffset:byteoffset+bytecount:2] = data
+            self._mask[byteoffset:byteoffset+bytecount:2] = b'\xFF' * count
+        if count:
+            self._recalcheader(byteoffset, bytecount)
+        self._locker.unlock()
+        ## @endcond
+
+    def getint8s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` int8 values from register memory starting at `offset`.
+
+        Same as `getvalues('int8', offset, count)`.
+        """
+        return self.getvalues('int8', offset, count)
+
+    def setint8s(self, offset:int, values):
+        """
+        Write sequence of int8 values into register memory starting at `offset`.
+
+        Same as `setvalues('int8', offset, values)`.
+        """
+        self.setvalues('int8', offset, values)
+
+    def getuint8s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` uint8 values from register memory starting at `offset`.
+
+        Same as `getvalues('uint8', offset, count)`.
+        """
+        return self.getvalues('uint8', offset, count)
+
+    def setuint8s(self, offset:int, values):
+        """
+        Write sequence of uint8 values into register memory starting at `offset`.
+
+        Same as `setvalues('uint8', offset, values)`.
+        """
+        self.setvalues('uint8', offset, values)
+
+    def getint16s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` int16 values from register memory starting at `offset`.
+
+        Same as `getvalues('int16', offset, count)`.
+        """
+        return self.getvalues('int16', offset, count)
+
+    def setint16s(self, offset:int, values):
+        """
+        Write sequence of int16 values into register memory starting at `offset`.
+
+        Same as `setvalues('int16', offset, values)`.
+        """
+        self.setvalues('int16', offset, values)
+
+    def getuint16s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` uint16 values from register memory starting at `offset`.
+
+        Same as `getvalues('uint16', offset, count)`.
+        """
+        return self.getvalues('uint16', offset, count)
+
+    def setuint16s(self, offset:int, values):
+        """
+        Write sequence of uint16 values into register memory starting at `offset`.
+
+        Same as `setvalues('uint16', offset, values)`.
+        """
+        self.setvalues('uint16', offset, values)
+
+    def getint32s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` int32 values from register memory starting at `offset`.
+
+        Same as `getvalues('int32', offset, count)`.
+        """
+        return self.getvalues('int32', offset, count)
+
+    def setint32s(self, offset:int, values):
+        """
+        Write sequence of int32 values into register memory starting at `offset`.
+
+        Same as `setvalues('int32', offset, values)`.
+        """
+        self.setvalues('int32', offset, values)
+
+    def getuint32s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` uint32 values from register memory starting at `offset`.
+
+        Same as `getvalues('uint32', offset, count)`.
+        """
+        return self.getvalues('uint32', offset, count)
+
+    def setuint32s(self, offset:int, values):
+        """
+        Write sequence of uint32 values into register memory starting at `offset`.
+
+        Same as `setvalues('uint32', offset, values)`.
+        """
+        self.setvalues('uint32', offset, values)
+
+    def getint64s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` int64 values from register memory starting at `offset`.
+
+        Same as `getvalues('int64', offset, count)`.
+        """
+        return self.getvalues('int64', offset, count)
+
+    def setint64s(self, offset:int, values):
+        """
+        Write sequence of int64 values into register memory starting at `offset`.
+
+        Same as `setvalues('int64', offset, values)`.
+        """
+        self.setvalues('int64', offset, values)
+
+    def getuint64s(self, offset:int, count:int)->list:
+        """
+        Return list of `count` uint64 values from register memory starting at `offset`.
+
+        Same as `getvalues('uint64', offset, count)`.
+        """
+        return self.getvalues('uint64', offset, count)
+
+    def setuint64s(self, offset:int, values):
+        """
+        Write sequence of uint64 values into register memory starting at `offset`.
+
+        Same as `setvalues('uint64', offset, values)`.
+        """
+        self.setvalues('uint64', offset, values)
+
+    def getfloats(self, offset:int, count:int)->list:
+        """
+        Return list of `count` 32-bit float values from register memory starting at `offset`.
+
+        Same as `getvalues('float', offset, count)`.
+        """
+        return self.getvalues('float', offset, count)
+
+    def setfloats(self, offset:int, values):
+        """
+        Write sequence of 32-bit float values into register memory starting at `offset`.
+
+        Same as `setvalues('float', offset, values)`.
+        """
+        self.setvalues('float', offset, values)
+
+    def getdoubles(self, offset:int, count:int)->list:
+        """
+        Return list of `count` 64-bit float values from register memory starting at `offset`.
+
+        Same as `getvalues('double', offset, count)`.
+        """
+        return self.getvalues('double', offset, count)
+
+    def setdoubles(self, offset:int, values):
+        """
+        Write sequence of 64-bit float values into register memory starting at `offset`.
+
+        Same as `setvalues('double', offset, values)`.
+        """
+        self.setvalues('double', offset, values)
+
+    def asarray(self, datatype:str, offset:int, count:int):
+        """
+        Return NumPy array of `count` values of `datatype` starting at register `offset`.
+
+        When device byte/register order can be represented by NumPy dtype
+        (`R0R1R2R3` with little-endian bytes, `R3R2R1R0` with big-endian bytes or any
+        16-bit data type) array is a view backed directly by shared memory.
+        After changing such array in place call `commitarray()` to mark changed
+        values for Modbus Server app. For other orders array is a decoded copy
+        and must be written back with `setarray()`.
+
+        Args:
+            datatype  Data type name: int16, uint16, int32, uint32, int64, uint64, float, double.
+            offset    Offset of the first register (0-based).
+            count     Count of values to read.
+
+        Returns:
+            `numpy.ndarray` with native values.
+
+        Note:
+            Requires NumPy. Raises `IndexError` if range is out of memory.
+        """
+        ## @cond
+        size, fmt = self._getnumpytype(datatype)
+        byteoffset = offset * 2
+        bytecount = count * size
+        self._checkrange(byteoffset, bytecount)
+        order = self._getnumpyorder(size)
+        if order is not None:
+            return numpy.frombuffer(self._mem, dtype=numpy.dtype(order+fmt), count=count, offset=byteoffset)
+        self._locker.lock()
+        raw = numpy.frombuffer(self._mem, dtype=numpy.uint8, count=bytecount, offset=byteoffset).reshape(count, size)
+        data = numpy.ascontiguousarray(raw[:, list(self._byteperm[size])])
+        self._locker.unlock()
+        return data.view(numpy.dtype('<'+fmt)).reshape(count)
+        ## @endcond
+
+    def setarray(self, datatype:str, offset:int, values):
+        """
+        Write sequence or NumPy array of `datatype` values starting at register `offset`.
+
+        All values are written under single lock with single memory header update.
+        Byte and register order is applied to the whole array at once.
+
+        Args:
+            datatype  Data type name: int16, uint16, int32, uint32, int64, uint64, float, double.
+            offset    Offset of the first register (0-based).
+            values    Sequence or `numpy.ndarray` of values to write.
+
+        Note:
+            Requires NumPy. Raises `IndexError` if range is out of memory.
+        """
+        ## @cond
+        size, fmt = self._getnumpytype(datatype)
+        data = numpy.ascontiguousarray(values, dtype=numpy.dtype('<'+fmt)).reshape(-1)
+        count = data.shape[0]
+        byteoffset = offset * 2
+        bytecount = count * size
+        self._checkrange(byteoffset, bytecount)
+        order = self._getnumpyorder(size)
+        if order == '>':
+            data = data.astype(numpy.dtype('>'+fmt))
+        elif order is None:
+            raw = numpy.empty((count, size), dtype=numpy.uint8)
+            raw[:, list(self._byteperm[size])] = data.view(numpy.uint8).reshape(count, size)
+            data = raw
+        self._writebytes(byteoffset, data.tobytes())
+        ## @endcond
+
+    def commitarray(self, array):
+        """
+        Mark values of `array` view (returned by `asarray()`) as changed.
+
+        Updates change mask and memory header so Modbus Server app takes
+        values written through the view.
+
+        Args:
+            array  `numpy.ndarray` view over the current memory object.
+
+        Note:
+            Raises `ValueError` if `array` is not a contiguous view of the current memory object.
+        """
+        ## @cond
+        byteoffset = array.__array_interface__['data'][0] - self._memaddr
+        bytecount = array.nbytes
+        if not array.flags.c_contiguous or byteoffset < 0 or byteoffset + bytecount > self._countbytes:
+            raise ValueError("Array is not a view of the current memory object")
+        self._locker.lock()
+        self._mask[byteoffset:byteoffset+bytecount] = b'\xFF' * bytecount
+        self._recalcheader(byteoffset, bytecount)
+        self._locker.unlock()
+        ## @endcond
 
     def getstring(self, regoffset:int, bytecount:int)->str:
         """
@@ -1382,6 +2612,467 @@ class _MemoryBlockRegs(_MemoryBlock):
         """
         self.setregstring(regoffset, value)
 
+    def getrecord(self, record, offset:int):
+        """
+        Return record of `record` layout (see `mbserver.Record`) starting at register `offset`.
+
+        Whole record is read with single lock and single memory copy.
+
+        Args:
+            record  `mbserver.Record` layout.
+            offset  Offset of the first register (0-based).
+
+        Returns:
+            Named tuple with the fields of the layout.
+
+        Note:
+            Raises `IndexError` if record is out of memory.
+        """
+        ## @cond
+        layout = record._getlayout(self)
+        byteoffset = offset * 2
+        self._checkrange(byteoffset, layout.size)
+        self._locker.lock()
+        data = bytes(self._mem[byteoffset:byteoffset+layout.size])
+        self._locker.unlock()
+        return record._tuple._make(layout.unpack_from(data))
+        ## @endcond
+
+    def setrecord(self, record, offset:int, value):
+        """
+        Write record of `record` layout (see `mbserver.Record`) starting at register `offset`.
+
+        Whole record is written with single memory copy and single memory header update.
+
+        Args:
+            record  `mbserver.Record` layout.
+            offset  Offset of the first register (0-based).
+            value   Named tuple, sequence of values in field order or `dict` with all fields.
+
+        Note:
+            Raises `IndexError` if record is out of memory.
+        """
+        ## @cond
+        layout = record._getlayout(self)
+        byteoffset = offset * 2
+        self._checkrange(byteoffset, layout.size)
+        self.setbytes(byteoffset, layout.pack(record._getvalues(value)))
+        ## @endcond
+
+    def getrecords(self, record, offset:int, count:int)->list:
+        """
+        Return list of `count` records of `record` layout placed one after another starting at register `offset`.
+
+        All records are read with single lock and single memory copy.
+
+        Note:
+            Raises `IndexError` if records are out of memory.
+        """
+        ## @cond
+        layout = record._getlayout(self)
+        size = layout.size
+        byteoffset = offset * 2
+        self._checkrange(byteoffset, size * count)
+        self._locker.lock()
+        data = bytes(self._mem[byteoffset:byteoffset+size*count])
+        self._locker.unlock()
+        make = record._tuple._make
+        if layout._struct is not None and not layout._strings:
+            return [make(v) for v in layout._struct.iter_unpack(data)]
+        return [make(layout.unpack_from(data, i)) for i in range(0, size * count, size)]
+        ## @endcond
+
+    def setrecords(self, record, offset:int, values):
+        """
+        Write sequence of records of `record` layout one after another starting at register `offset`.
+
+        All records are written with single memory copy and single memory header update.
+
+        Note:
+            Raises `IndexError` if records are out of memory.
+        """
+        ## @cond
+        layout = record._getlayout(self)
+        data = b''.join(layout.pack(record._getvalues(v)) for v in values)
+        byteoffset = offset * 2
+        self._checkrange(byteoffset, len(data))
+        if data:
+            self.setbytes(byteoffset, data)
+        ## @endcond
+
+    def unpack(self, fmt:str, regoffset:int)->tuple:
+        """
+        Return tuple of values read from register memory starting at `regoffset` according to `fmt`.
+
+        `fmt` is format string of `struct` module without byte order character.
+        Values are packed without alignment and every numeric value is decoded
+        using byte/register order of the device. Bytes of strings (`s`, `p`) are
+        stored like `getregstring()`/`setregstring()` do (byte pairs are swapped
+        for big-endian device). Compiled format is cached.
+        All values are read with single lock.
+
+        Args:
+            fmt        `struct` format, e.g. `'fIh'`, `'3H'`, `'8s'`.
+            regoffset  Register offset (0-based).
+
+        Example:
+            temp, runtime, status = mem3x.unpack('fIh', 0)
+
+        Note:
+            Raises `IndexError` if values are out of memory, `ValueError` if `fmt` is invalid.
+        """
+        ## @cond
+        st = self._formatcached(fmt)
+        byteoffset = regoffset * 2
+        self._checkrange(byteoffset, st.size)
+        self._locker.lock()
+        values = st.unpack_from(self._mem, byteoffset)
+        self._locker.unlock()
+        return values
+        ## @endcond
+
+    def pack(self, fmt:str, regoffset:int, *values):
+        """
+        Write `values` into register memory starting at `regoffset` according to `fmt`.
+
+        See `unpack()` for `fmt` description. All values are written with single
+        memory copy and single memory header update.
+
+        Example:
+            mem4x.pack('fIh', 0, 20.5, 1000, -1)
+
+        Note:
+            Raises `IndexError` if values are out of memory, `ValueError` if `fmt` is invalid.
+        """
+        ## @cond
+        st = self._formatcached(fmt)
+        byteoffset = regoffset * 2
+        self._checkrange(byteoffset, st.size)
+        data = st.pack(*values)
+        if data:
+            self.setbytes(byteoffset, data)
+        ## @endcond
+
+    def getformatcacheinfo(self):
+        """
+        Return statistics of the compiled `unpack()`/`pack()` format cache.
+
+        Returns:
+            Named tuple `(hits, misses, maxsize, currsize)` (see `functools.lru_cache`).
+        """
+        return self._formatcached.cache_info()
+
+
+class Record:
+    """Layout of structure of values placed one after another in register memory.
+
+       Layout is declared once and then whole structure can be read/written by
+       `getrecord()`/`setrecord()` of register memory with single memory copy
+       and single memory header update. Byte and register order of the device is applied.
+
+       Every field starts at register boundary: `int8`/`uint8` field occupies single register
+       (first byte), `('string', bytecount)` field occupies `(bytecount+1)//2` registers.
+
+       Example:
+           Pump = mbserver.Record(speed='float', status='uint16', runtime='uint32', name=('string', 16))
+           p = mem4x.getrecord(Pump, 100)
+           mem4x.setrecord(Pump, 100, p._replace(speed=p.speed + 1.0))
+           pumps = mem4x.getrecords(Pump, 1000, 400)
+    """
+    def __init__(self, **fields):
+        """
+        Constructor of the class.
+
+        Args:
+            fields  Field names with data type name (int8, uint8, int16, uint16, int32, uint32,
+                    int64, uint64, float, double) or `('string', bytecount)` tuple.
+        """
+        ## @cond
+        self._fields = []
+        regcount = 0
+        for name, spec in fields.items():
+            if isinstance(spec, str):
+                datatype, bytecount = spec, 0
+            else:
+                datatype, bytecount = spec
+            if datatype == 'string':
+                if bytecount <= 0:
+                    raise ValueError(f"Invalid byte count of string field '{name}'")
+                regcount += (bytecount + 1) // 2
+            elif datatype in MB_DATATYPES:
+                regcount += (MB_DATATYPES[datatype][0] + 1) // 2
+            else:
+                raise ValueError(f"Unsupported data type of field '{name}': '{datatype}'")
+            self._fields.append((datatype, bytecount))
+        self._names = tuple(fields)
+        self._regcount = regcount
+        self._tuple = namedtuple('Record', self._names)
+        self._layouts = {}
+        ## @endcond
+
+    def __call__(self, *args, **kwargs):
+        """Return new record value (named tuple) with the fields of the layout."""
+        return self._tuple(*args, **kwargs)
+
+    def fields(self)->tuple:
+        """Return tuple of field names."""
+        return self._names
+
+    def regcount(self)->int:
+        """Return count of registers occupied by single record."""
+        return self._regcount
+
+    ## @cond
+    def _getlayout(self, mem)->_MbLayout:
+        # Layout is compiled once for every byte/register order
+        key = (mem._byteorder, mem._registerorder)
+        layout = self._layouts.get(key)
+        if layout is None:
+            layout = _MbLayout(mem, self._fields)
+            self._layouts[key] = layout
+        return layout
+
+    def _getvalues(self, value):
+        if isinstance(value, dict):
+            return [value[name] for name in self._names]
+        return value
+    ## @endcond
+
+
+## @cond
+class _MbIoPlan:
+    # Compiled plan of `read_many()`/`write_many()` for fixed list of `(adr, datatype)` items.
+    # Items are grouped by memory object, sorted by offset and merged into blocks
+    # (items separated by not more than `gap` registers/bits share the block),
+    # so every memory object is locked once and every block is copied once.
+    def __init__(self, device, items, gap:int):
+        groups = {}
+        count = 0
+        for adr, datatype in items:
+            mem, offset = device._resolve(adr)
+            isbits = isinstance(mem, _MemoryBlockBits)
+            if datatype == 'bit':
+                if not isbits:
+                    raise ValueError("Data type 'bit' is supported by bit memory only")
+                nbits = 1
+                span = 1
+            else:
+                size, fmt = mem._getdatatype(datatype)
+                nbits = size * 8
+                span = nbits if isbits else (size + 1) // 2
+            if offset < 0 or offset + span > mem._count:
+                raise IndexError("Memory index out of range")
+            groups.setdefault(mem, []).append((offset, offset + span, count, datatype, nbits))
+            count += 1
+        self._count = count
+        self._groups = []
+        for mem in (device._mem0x, device._mem1x, device._mem3x, device._mem4x):
+            spans = groups.get(mem)
+            if not spans:
+                continue
+            isbits = isinstance(mem, _MemoryBlockBits)
+            spans.sort()
+            blocks = []
+            entries = []
+            for begin, end, index, datatype, nbits in spans:
+                if blocks and begin <= blocks[-1][1] + gap:
+                    if end > blocks[-1][1]:
+                        blocks[-1][1] = end
+                else:
+                    blocks.append([begin, end])
+                b = len(blocks) - 1
+                if datatype == 'bit':
+                    codec = wcodec = wmask = None
+                elif datatype in ('float', 'double'):
+                    codec = wcodec = mem._codecs[datatype]
+                    wmask = None
+                else:
+                    codec = mem._codecs[datatype]
+                    wcodec = mem._codecs['uint%d' % nbits]
+                    wmask = (1 << nbits) - 1
+                local = begin - blocks[b][0]
+                if not isbits:
+                    local *= 2
+                entries.append((index, b, local, nbits, codec, wcodec, wmask, begin))
+            self._groups.append((mem, isbits, [tuple(b) for b in blocks], entries))
+
+    def read(self)->list:
+        res = [None] * self._count
+        for mem, isbits, blocks, entries in self._groups:
+            m = mem._mem
+            mem._locker.lock()
+            if isbits:
+                data = [bytes(m[begin >> 3:(end + 7) >> 3]) for begin, end in blocks]
+            else:
+                data = [bytes(m[begin * 2:end * 2]) for begin, end in blocks]
+            mem._locker.unlock()
+            if isbits:
+                data = [int.from_bytes(d, byteorder=MB_BYTEORDER_DEFAULT) >> (blocks[i][0] & 7) for i, d in enumerate(data)]
+                for index, b, local, nbits, codec, _, _, _ in entries:
+                    v = (data[b] >> local) & ((1 << nbits) - 1)
+                    res[index] = bool(v) if codec is None else codec.unpack(v.to_bytes(nbits >> 3, byteorder=MB_BYTEORDER_DEFAULT))[0]
+            else:
+                for index, b, local, _, codec, _, _, _ in entries:
+                    res[index] = codec.unpack_from(data[b], local)[0]
+        return res
+
+    def write(self, values):
+        if len(values) != self._count:
+            raise ValueError("Count of values doesn't match count of items")
+        for mem, isbits, blocks, entries in self._groups:
+            # Values are encoded before memory is locked
+            if isbits:
+                vals = [0] * len(blocks)
+                bits = [0] * len(blocks)
+                for index, b, local, nbits, _, wcodec, wmask, _ in entries:
+                    v = values[index]
+                    if wcodec is None:
+                        v = 1 if v else 0
+                    else:
+                        v = int.from_bytes(wcodec.pack(v if wmask is None else v & wmask), byteorder=MB_BYTEORDER_DEFAULT)
+                    m = ((1 << nbits) - 1) << local
+                    vals[b] = (vals[b] & ~m) | (v << local)
+                    bits[b] |= m
+                mem._locker.lock()
+                for (begin, end), v, m in zip(blocks, vals, bits):
+                    shift = begin & 7
+                    byteoffset = begin >> 3
+                    mem._mergebits(byteoffset, ((end + 7) >> 3) - byteoffset, m << shift, v << shift)
+                mem._locker.unlock()
+            else:
+                data = []
+                for index, _, _, nbits, _, wcodec, wmask, offset in entries:
+                    v = values[index]
+                    data.append((offset * 2, nbits >> 3, wcodec.pack(v if wmask is None else v & wmask)))
+                mem._locker.lock()
+                if mem._suppress:
+                    # Only changed items are written and marked
+                    for byteoffset, c, b in data:
+                        if not mem._countwrite(mem._mem[byteoffset:byteoffset+c] == b):
+                            mem._mem [byteoffset:byteoffset+c] = b
+                            mem._mask[byteoffset:byteoffset+c] = b'\xFF' * c
+                            mem._recalcheader(byteoffset, c)
+                else:
+                    for byteoffset, c, b in data:
+                        mem._mem [byteoffset:byteoffset+c] = b
+                        mem._mask[byteoffset:byteoffset+c] = b'\xFF' * c
+                    for begin, end in blocks:
+                        mem._recalcheader(begin * 2, (end - begin) * 2)
+                mem._locker.unlock()
+## @endcond
+
+
+## @cond
+class _MbTagRegs:
+    # Tag of register memory with memory object, byte range and converters resolved once
+    __slots__ = ('_mem', '_begin', '_codec', '_wcodec', '_wmask')
+
+    def __init__(self, mem, offset:int, datatype:str):
+        size, fmt = mem._getdatatype(datatype)
+        self._mem = mem
+        self._begin = offset * 2
+        self._codec = mem._codecs[datatype]
+        if datatype in ('float', 'double'):
+            self._wcodec = self._codec
+            self._wmask = -1
+        else:
+            self._wcodec = mem._codecs['uint%d' % (size * 8)]
+            self._wmask = (1 << (size * 8)) - 1
+        mem._checkrange(self._begin, size)
+
+    def get(self):
+        mem = self._mem
+        mem._locker.lock()
+        v = self._codec.unpack_from(mem._mem, self._begin)[0]
+        mem._locker.unlock()
+        return v
+
+    def set(self, value):
+        self._mem._writebytes(self._begin, self._wcodec.pack(value & self._wmask if self._wmask >= 0 else value))
+
+
+class _MbTagBits:
+    # Tag of bit memory with memory object, byte range, bit shift and converters resolved once
+    __slots__ = ('_mem', '_begin', '_end', '_shift', '_bits', '_codec', '_wcodec', '_wmask', '_size')
+
+    def __init__(self, mem, offset:int, datatype:str):
+        if datatype == 'bit':
+            nbits = 1
+            self._codec = self._wcodec = None
+            self._wmask = 1
+        else:
+            size, fmt = mem._getdatatype(datatype)
+            nbits = size * 8
+            self._codec = mem._codecs[datatype]
+            self._wcodec = self._codec if datatype in ('float', 'double') else mem._codecs['uint%d' % nbits]
+            self._wmask = -1 if datatype in ('float', 'double') else (1 << nbits) - 1
+        if offset < 0 or offset + nbits > mem._count:
+            raise IndexError("Memory index out of range")
+        self._mem = mem
+        self._begin = offset >> 3
+        self._end = (offset + nbits + 7) >> 3
+        self._shift = offset & 7
+        self._bits = (1 << nbits) - 1
+        self._size = nbits >> 3
+
+    def get(self):
+        mem = self._mem
+        mem._locker.lock()
+        v = int.from_bytes(mem._mem[self._begin:self._end], byteorder=MB_BYTEORDER_DEFAULT)
+        mem._locker.unlock()
+        v = (v >> self._shift) & self._bits
+        if self._codec is None:
+            return bool(v)
+        return self._codec.unpack(v.to_bytes(self._size, byteorder=MB_BYTEORDER_DEFAULT))[0]
+
+    def set(self, value):
+        if self._wcodec is None:
+            v = 1 if value else 0
+        else:
+            v = int.from_bytes(self._wcodec.pack(value & self._wmask if self._wmask >= 0 else value), byteorder=MB_BYTEORDER_DEFAULT)
+        mem = self._mem
+        mem._locker.lock()
+        mem._mergebits(self._begin, self._end - self._begin, self._bits << self._shift, v << self._shift)
+        mem._locker.unlock()
+## @endcond
+
+
+class _MbSnapshot:
+    """Read-only copy of all device memory objects taken at single server cycle.
+
+       Object is returned by `_MbDevice.snapshot()`. Its memory objects have the same
+       get functions as the live ones but read local copy without any locking.
+       Set functions raise `TypeError`.
+    """
+    ## @cond
+    def __init__(self, cycle:int, mem0x, mem1x, mem3x, mem4x):
+        self._cycle = cycle
+        self._mem0x = mem0x
+        self._mem1x = mem1x
+        self._mem3x = mem3x
+        self._mem4x = mem4x
+    ## @endcond
+
+    def getcycle(self)->int:
+        """Return cycle counter of Modbus Server app synchronizer the snapshot was taken at."""
+        return self._cycle
+
+    def getmem0x(self)->_MemoryBlockBits:
+        """Return copy of device `0x` memory."""
+        return self._mem0x
+
+    def getmem1x(self)->_MemoryBlockBits:
+        """Return copy of device `1x` memory."""
+        return self._mem1x
+
+    def getmem3x(self)->_MemoryBlockRegs:
+        """Return copy of device `3x` memory."""
+        return self._mem3x
+
+    def getmem4x(self)->_MemoryBlockRegs:
+        """Return copy of device `4x` memory."""
+        return self._mem4x
+
 
 class _MbDevice:
     """Class for access device parameters.
@@ -1440,6 +3131,14 @@ class _MbDevice:
         if self._excmem is None:
             self._excmem = self._mem0x
             self._excoffset = 0
+        # Bounded cache: raw `int`/`str` address -> (memory object, offset)
+        self._resolvecached = lru_cache(maxsize=MB_ADDRESSCACHE_SIZE)(self._resolveraw)
+        # Bounded cache: (items, gap) -> compiled `read_many()`/`write_many()` plan
+        self._plancached = lru_cache(maxsize=MB_IOPLANCACHE_SIZE)(self._makeplan)
+        # Scheduler of the `Loop`-script
+        self._scheduler = mbscheduler.Scheduler(self)
+        # Time (seconds) and count of memory locks of the current cycle, `None` if profiling is off
+        self._lockstats = None
 
     def __del__(self):
         try:
@@ -1447,6 +3146,28 @@ class _MbDevice:
         except RuntimeError:
             pass
     
+    def _resolveraw(self, adr):
+        madr = modbus.Address(adr)
+        return self._memdict[madr.type()], madr.offset()
+
+    def _resolve(self, adr):
+        if isinstance(adr, modbus.Address):
+            return self._memdict[adr.type()], adr.offset()
+        return self._resolvecached(adr)
+
+    def _makeplan(self, items:tuple, gap:int):
+        return _MbIoPlan(self, items, gap)
+
+    def _getplan(self, items, gap:int):
+        if not isinstance(items, tuple):
+            items = tuple(items)
+        try:
+            hash(items)
+        except TypeError:
+            # Items are not hashable (e.g. lists): plan is not cached
+            return _MbIoPlan(self, items, gap)
+        return self._plancached(items, gap)
+
     def _getstring(self, offset:int)->str:
         c = 0
         while self._pmemstrtable[offset+c][0] != 0:
@@ -1518,6 +3239,127 @@ class _MbDevice:
         self._shm.unlock()
         return r
 
+    async def cycle(self)->bool:
+        """
+        Coroutine that waits for the start of the next cycle of the scheduler (see `getscheduler()`).
+
+        Asyncio version of the implicit cycle of the `Loop`-script: other asyncio tasks
+        run while waiting. Counter of python cycles (`getpycycle()`) is incremented
+        for every finished cycle.
+
+        Returns:
+            `True` if the next cycle must be executed, `False` if device is stopped.
+
+        Example:
+            async def loop():
+                while await mbdevice.cycle():
+                    mem4x[0] += 1
+        """
+        ## @cond
+        if self._scheduler.getcyclecount():
+            self._incpycycle()
+        return await self._scheduler.waitasync()
+        ## @endcond
+
+    def runasync(self, main):
+        """
+        Run coroutine `main` in the asyncio event loop of the current process until it is finished
+        or device is stopped.
+
+        When device is stopped `main` and all other tasks of the event loop are cancelled.
+        If `Init`-script defines `async def loop()` it is run by `runasync(loop())` instead
+        of `Loop`-script, so timers, sockets and background coroutines work concurrently
+        with memory access.
+
+        Example:
+            async def loop():
+                asyncio.ensure_future(poll_socket())
+                while await mbdevice.cycle():
+                    mem4x.setfloat(0, temperature)
+        """
+        ## @cond
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            task = loop.create_task(main)
+            loop.create_task(self._watchstop(task))
+            try:
+                loop.run_until_complete(task)
+            except asyncio.CancelledError:
+                pass
+        finally:
+            # Watcher and all tasks left by `main` (e.g. started by `ensure_future()`) are cancelled
+            # and awaited to run their cleanup even if `main` raised exception (it is re-raised)
+            try:
+                alltasks = asyncio.all_tasks(loop) if hasattr(asyncio, 'all_tasks') else asyncio.Task.all_tasks(loop)
+                pending = [t for t in alltasks if not t.done()]
+                for t in pending:
+                    t.cancel()
+                if pending:
+                    loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            finally:
+                asyncio.set_event_loop(None)
+                loop.close()
+        ## @endcond
+
+    ## @cond
+    async def _watchstop(self, task):
+        # Cancels `task` when device is stopped
+        while self.getflags() & MB_DEVICEFLAG_RUN:
+            await asyncio.sleep(mbscheduler.MB_SCHEDULER_STOPCHECK / 1000)
+        task.cancel()
+    ## @endcond
+
+    def getscheduler(self)->mbscheduler.Scheduler:
+        """
+        Return scheduler (`mbscheduler.Scheduler`) which starts every cycle of the `Loop`-script.
+
+        Scheduler can be used to change period and overrun policy of the loop at runtime.
+        """
+        return self._scheduler
+
+    def getsynccycles(self)->int:
+        """Return count of server sync cycles per cycle of the `Loop`-script (0 - loop is driven by period)."""
+        return self._scheduler.getsynccycles()
+
+    def setsynccycles(self, count:int):
+        """
+        Run `Loop`-script once per `count` sync cycles of Modbus Server app instead of period.
+
+        Every cycle of the script starts right after Modbus Server app synchronized device memory
+        (`getcycle()` was incremented), so values written by the script are taken by the next
+        sync pass. `count = 0` returns to periodic mode. Same as `getscheduler().setsynccycles(count)`.
+
+        Example:
+            mbdevice.setsynccycles(1)
+        """
+        self._scheduler.setsynccycles(count)
+
+    def every(self, period:int, priority:int=0):
+        """
+        Decorator which registers function as periodic task of the device scheduler.
+
+        Task runs every `period` millisec independently of the period of `Loop`-script
+        while scheduler waits for the next cycle. Deadlines of all tasks are phase-aligned
+        to the common grid, tasks with greater `priority` run first when several tasks are due.
+        Function itself is returned unchanged, task object (`mbscheduler.Task`)
+        with statistics of the task is available by `getscheduler().gettasks()`.
+        Same as `getscheduler().addtask(func, period, priority)`.
+
+        Example:
+            @mbdevice.every(10, priority=1)
+            def control():
+                mem4x[0] = mem3x[0] * 2
+
+            @mbdevice.every(1000)
+            def statistics():
+                mem4x[1] = mem4x[1] + 1
+        """
+        def decorator(func):
+            self._scheduler.addtask(func, period, priority)
+            return func
+        return decorator
+
     def getcount0x(self)->int:
         """Return count of coils (bits, 0x) of the current device."""
         self._shm.lock()
@@ -1573,8 +3415,227 @@ class _MbDevice:
     ## @cond
     def _incpycycle(self):
         return self._python.incpycycle()
+
+    def _updateloopstats(self, execns:int, jitterns:int, periodns:int, overruns:int):
+        # Called by scheduler at the start of every cycle with execution time of the previous cycle
+        lockstats = self._lockstats
+        if lockstats is None:
+            self._python.updateloopstats(execns // 1000, jitterns // 1000, periodns // 1000, overruns, 0, 0)
+        else:
+            self._python.updateloopstats(execns // 1000, jitterns // 1000, periodns // 1000, overruns,
+                                         int(lockstats[0] * 1000000), lockstats[1])
+            lockstats[0] = 0.0
+            lockstats[1] = 0
     ## @endcond
 
+    def getloopstats(self):
+        """
+        Return timing statistics of the `Loop`-script.
+
+        Statistics is updated by scheduler at the start of every cycle and is also
+        exported through shared memory, so it can be read by Modbus Server app.
+
+        Returns:
+            Named tuple with fields (times in microsec):
+            * `cycles` - count of finished cycles;
+            * `period` - period of cycle;
+            * `last`, `min`, `max`, `avg` - execution time of the last cycle, min, max and average (EWMA);
+            * `overruns` - count of cycles which didn't finish before the next deadline;
+            * `locktime`, `lockcount` - time of holding memory locks and count of locks during last cycle
+              (see `setlockprofiling()`);
+            * `jitter` - tuple with counts of cycle starts by its delay relative to the deadline
+              (buckets bounds are `MB_LOOPJITTER_BUCKETS`).
+        """
+        return self._python.getloopstats()
+
+    def setlockprofiling(self, enabled:bool):
+        """
+        Turn on/off measurement of time of holding memory locks (off by default).
+
+        When on, `getloopstats()` returns time and count of locks of all memory objects
+        during the last cycle. Raises `RuntimeError` if called within `transaction()`/`batch()`.
+        """
+        ## @cond
+        mems = (self._mem0x, self._mem1x, self._mem3x, self._mem4x)
+        if any(m._txndepth for m in mems):
+            raise RuntimeError("Lock profiling can't be changed within transaction")
+        if enabled and self._lockstats is None:
+            self._lockstats = [0.0, 0]
+            for m in mems:
+                m._shm = m._locker = _MbLockProfiler(m._shm, self._lockstats)
+        elif not enabled and self._lockstats is not None:
+            self._lockstats = None
+            for m in mems:
+                m._shm = m._locker = m._shm._shm
+        ## @endcond
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager that runs transaction on all device memory objects at once.
+
+        Same as nested `transaction()` for `mem0x`, `mem1x`, `mem3x` and `mem4x`:
+        every memory is locked once and its header is updated once at the end of the block,
+        so all changes made within the block are atomic from the Modbus Server app's point of view.
+
+        Example:
+            with mbdevice.batch():
+                mem4x.setuint16(0, mem3x.getuint16(0))
+                mem0x.setbit(5, True)
+        """
+        ## @cond
+        done = []
+        try:
+            for m in (self._mem0x, self._mem1x, self._mem3x, self._mem4x):
+                m._begintransaction()
+                done.append(m)
+            yield self
+        finally:
+            for m in reversed(done):
+                m._endtransaction()
+        ## @endcond
+
+    def snapshot(self)->_MbSnapshot:
+        """
+        Return consistent read-only copy of `mem0x`, `mem1x`, `mem3x` and `mem4x`.
+
+        All memory objects are locked at once (like `batch()`) and every one
+        is copied with single bulk copy. Modbus Server app locks memory objects one at a time
+        and increments its cycle counter at the end of every sync pass, so copy is retried
+        while sync pass is in progress or cycle counter was changed during the copy.
+        Therefore copy always belongs to a single cycle which is returned by `getcycle()` of the snapshot.
+
+        Example:
+            s = mbdevice.snapshot()
+            mem = s.getmem3x()
+            values = [mem.getuint16(i) for i in range(300)]
+        """
+        ## @cond
+        while True:
+            state = self._getsyncstate()
+            if not (state[0] & MB_DEVICEFLAG_SYNC):
+                with self.batch():
+                    mems = (self._mem0x._snapshot(), self._mem1x._snapshot(),
+                            self._mem3x._snapshot(), self._mem4x._snapshot())
+                if self._getsyncstate() == state:
+                    return _MbSnapshot(state[1], *mems)
+            sleep(MB_SNAPSHOT_RETRYSLEEP)
+        ## @endcond
+
+    ## @cond
+    def _getsyncstate(self)->tuple:
+        # Returns `(flags, cycle)` of Modbus Server app synchronizer read at once
+        self._shm.lock()
+        r = (self._control.flags, self._control.cycle)
+        self._shm.unlock()
+        return r
+    ## @endcond
+
+    def getaddresscacheinfo(self):
+        """
+        Return statistics of the address cache used by `get<datatype>(adr)`/`set<datatype>(adr, value)`.
+
+        `int` and `str` addresses are parsed once and kept resolved in bounded
+        LRU cache (`MB_ADDRESSCACHE_SIZE` entries). `modbus.Address` objects are not cached.
+
+        Returns:
+            Named tuple `(hits, misses, maxsize, currsize)` (see `functools.lru_cache`).
+        """
+        return self._resolvecached.cache_info()
+
+    def clearaddresscache(self):
+        """Clear the address cache and its statistics."""
+        self._resolvecached.cache_clear()
+
+    def read_many(self, items, gap:int=MB_IOPLAN_GAP)->list:
+        """
+        Return list of values for many `(adr, datatype)` items at once.
+
+        Items are grouped by memory type, sorted by offset and items separated
+        by not more than `gap` registers (bits for `0x`/`1x`) are merged into single block.
+        Every memory object is locked once and every block is copied once,
+        then all values are decoded from the copies.
+        Compiled plan is cached for repeated list of items (`MB_IOPLANCACHE_SIZE` plans).
+
+        Args:
+            items  Sequence of `(adr, datatype)` tuples. `adr` is `modbus.Address` or int/str address,
+                   `datatype` is int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double
+                   or `bit` (bit memory only).
+            gap    Max gap between items merged into single block.
+
+        Returns:
+            List of values in the same order as `items`.
+
+        Example:
+            tags = [("%MW0", 'float'), ("%MW10", 'uint16'), ("%Q5", 'bit')]
+            temp, status, run = mbdevice.read_many(tags)
+
+        Note:
+            Raises `IndexError` if any item is out of memory.
+        """
+        return self._getplan(items, gap).read()
+
+    def write_many(self, items, values, gap:int=MB_IOPLAN_GAP):
+        """
+        Write `values` into many `(adr, datatype)` items at once.
+
+        Uses the same (cached) plan as `read_many()`: every memory object is locked once
+        and memory header is updated once per block. Only bytes (bits for `0x`/`1x`)
+        of the written items are marked as changed.
+
+        Args:
+            items   Sequence of `(adr, datatype)` tuples (see `read_many()`).
+            values  Sequence of values in the same order as `items`.
+            gap     Max gap between items merged into single block.
+
+        Example:
+            mbdevice.write_many(tags, [21.5, 1, True])
+
+        Note:
+            Raises `IndexError` if any item is out of memory.
+        """
+        self._getplan(items, gap).write(values)
+
+    def tag(self, adr, datatype:str):
+        """
+        Return precompiled tag object for value of `datatype` at `adr`.
+
+        Memory object, offset, bounds and data converters (byte/register order) are resolved once,
+        so `get()`/`set(value)` of the tag do only memory access. Tag works within `transaction()`/`batch()`.
+
+        Args:
+            adr       Address of memory. Accepts `modbus.Address` or int/str address.
+            datatype  Data type name: int8, uint8, int16, uint16, int32, uint32, int64, uint64, float, double
+                      or `bit` (bit memory only).
+
+        Returns:
+            Object with `get()` and `set(value)` functions.
+
+        Example:
+            temp = mbdevice.tag("%MW100", 'float')
+            temp.set(temp.get() + 0.5)
+
+        Note:
+            Raises `IndexError` if value is out of memory.
+        """
+        ## @cond
+        mem, offset = self._resolve(adr)
+        if isinstance(mem, _MemoryBlockBits):
+            return _MbTagBits(mem, offset, datatype)
+        if datatype == 'bit':
+            raise ValueError("Data type 'bit' is supported by bit memory only")
+        return _MbTagRegs(mem, offset, datatype)
+        ## @endcond
+
+    def getplancacheinfo(self):
+        """
+        Return statistics of the plan cache used by `read_many()`/`write_many()`.
+
+        Returns:
+            Named tuple `(hits, misses, maxsize, currsize)` (see `functools.lru_cache`).
+        """
+        return self._plancached.cache_info()
+
     def getmem0x(self)->_MemoryBlockBits:
         """Return object that provides access to device `0x` memory."""
         return self._mem0x
@@ -1601,8 +3662,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getint8(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getint8(offset)
 
     def setint8(self, adr, value:int):
         """
@@ -1615,8 +3676,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setint8(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setint8(offset, value)
 
     def getuint8(self, adr)->int:
         """
@@ -1628,8 +3689,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getuint8(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getuint8(offset)
 
     def setuint8(self, adr, value:int):
         """
@@ -1642,8 +3703,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setuint8(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setuint8(offset, value)
 
     def getint16(self, adr)->int:
         """
@@ -1655,8 +3716,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getint16(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getint16(offset)
 
     def setint16(self, adr, value:int):
         """
@@ -1669,8 +3730,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setint16(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setint16(offset, value)
 
     def getuint16(self, adr)->int:
         """
@@ -1682,8 +3743,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getuint16(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getuint16(offset)
     
     def setuint16(self, adr, value:int):
         """
@@ -1696,8 +3757,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setuint16(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setuint16(offset, value)
 
     def getint32(self, adr)->int:
         """
@@ -1709,8 +3770,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getint32(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getint32(offset)
 
     def setint32(self, adr, value:int):
         """
@@ -1723,8 +3784,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setint32(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setint32(offset, value)
 
     def getuint32(self, adr)->int:
         """
@@ -1736,8 +3797,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getuint32(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getuint32(offset)
     
     def setuint32(self, adr, value:int):
         """
@@ -1750,8 +3811,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setuint32(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setuint32(offset, value)
 
     def getint64(self, adr)->int:
         """
@@ -1763,8 +3824,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getint64(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getint64(offset)
 
     def setint64(self, adr, value:int):
         """
@@ -1777,8 +3838,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setint64(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setint64(offset, value)
 
     def getuint64(self, adr)->int:
         """
@@ -1790,8 +3851,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getuint64(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getuint64(offset)
     
     def setuint64(self, adr, value:int):
         """
@@ -1804,8 +3865,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setuint64(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setuint64(offset, value)
 
     def getfloat(self, adr)->float:
         """
@@ -1817,8 +3878,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getfloat(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getfloat(offset)
 
     def setfloat(self, adr, value:float):
         """
@@ -1831,8 +3892,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setfloat(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setfloat(offset, value)
 
     def getdouble(self, adr)->float:
         """
@@ -1844,8 +3905,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getdouble(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getdouble(offset)
     
     def setdouble(self, adr, value:float):
         """
@@ -1858,8 +3919,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setdouble(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setdouble(offset, value)
 
     def getstring(self, adr)->str:
         """
@@ -1871,8 +3932,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        return self._memdict[madr.type()].getstring(madr.offset())
+        mem, offset = self._resolve(adr)
+        return mem.getstring(offset)
     
     def setstring(self, adr, value:str):
         """
@@ -1885,8 +3946,8 @@ class _MbDevice:
         Note:
             Since v0.4.4
         """
-        madr = adr if isinstance(adr, modbus.Address) else modbus.Address(adr)
-        self._memdict[madr.type()].setstring(madr.offset(), value)
+        mem, offset = self._resolve(adr)
+        mem.setstring(offset, value)
 
 
 ## @cond
@@ -1904,6 +3965,18 @@ class _MemoryPythonBlock:
         self._pcontrol = pcontrol
         self._control = pcontrol.contents
         self._cyclecounter = 0
+        # Loop statistics are exported only if Modbus Server app allocated extended block
+        self._stats = self._memsize >= sizeof(CPythonBlock) and self._control.version >= MB_PYTHONBLOCK_VERSION_LOOPSTATS
+        self._period = 0
+        self._execlast = 0
+        self._execmin = 0
+        self._execmax = 0
+        self._execavg8 = 0 # average execution time (EWMA) in fixed point: `avg * 8`
+        self._execcount = 0
+        self._overruns = 0
+        self._locktime = 0
+        self._lockcount = 0
+        self._jitter = [0] * (len(MB_LOOPJITTER_BUCKETS)+1)
 
     def __del__(self):
         try:
@@ -1922,5 +3995,41 @@ class _MemoryPythonBlock:
         self._shm.lock()
         self._control.pycycle = self._cyclecounter
         self._shm.unlock()
+
+    def updateloopstats(self, execus:int, jitterus:int, periodus:int, overruns:int, lockus:int, lockcount:int):
+        if self._execcount:
+            if execus < self._execmin:
+                self._execmin = execus
+            if execus > self._execmax:
+                self._execmax = execus
+            self._execavg8 += execus - ((self._execavg8 + 4) >> 3)
+        else:
+            self._execmin = self._execmax = execus
+            self._execavg8 = execus << 3
+        self._execcount += 1
+        self._execlast = execus
+        self._period = periodus
+        self._overruns = overruns
+        self._locktime = lockus
+        self._lockcount = lockcount
+        bucket = bisect_right(MB_LOOPJITTER_BUCKETS, jitterus)
+        self._jitter[bucket] += 1
+        if self._stats:
+            c = self._control
+            self._shm.lock()
+            c.period       = periodus
+            c.execLast     = execus
+            c.execMin      = self._execmin
+            c.execMax      = self._execmax
+            c.execAvg      = (self._execavg8 + 4) >> 3
+            c.overrunCount = overruns
+            c.lockTime     = lockus
+            c.lockCount    = lockcount
+            c.jitterHist[bucket] = self._jitter[bucket]
+            self._shm.unlock()
+
+    def getloopstats(self):
+        return _MbLoopStats(self._execcount, self._period, self._execlast, self._execmin, self._execmax, (self._execavg8 + 4) >> 3,
+                            self._overruns, self._locktime, self._lockcount, tuple(self._jitter))
 ## @endcond
 
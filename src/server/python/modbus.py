@@ -1,9 +1,14 @@
 """@package modbus
 Module to work with Modbus protocol.
  
-Includes class Address to work with modbus address.
+Includes class Address to work with modbus address,
+class AddressRange to work with contiguous range of addresses
+and class AddressIndex to find range that covers address.
 """
 
+from array import array
+from bisect import bisect_right
+
 # Modbus memory types
 Memory_Unknown = -1 ##< Memory type for invalid address
 Memory_0x      = 0  ##< Memory type for coils
@@ -36,6 +41,52 @@ IEC61131PrefixMap = {
                 Memory_4x: sIEC61131Prefix4x,
             }
 
+## @cond
+# IEC-61131 prefix -> memory type
+_IEC61131PrefixTypes = { prefix: tp for tp, prefix in IEC61131PrefixMap.items() }
+
+# Plain ASCII characters of address digits (`str.isascii()` is available since Python 3.7 only)
+_DecDigits = frozenset('0123456789')
+_HexDigits = frozenset('0123456789abcdefABCDEF')
+
+def _parseint(v: int) -> tuple:
+    # Returns `(type, offset)` for integer address representation or raises `ValueError`
+    tp, number = divmod(v, 100000)
+    if tp in MemoryTypeSet and 1 <= number <= 65536:
+        return tp, number - 1
+    raise ValueError(f"Invalid integer '{v}' to convert into Address")
+
+def _parsestr(s: str) -> tuple:
+    # Returns `(type, offset)` for address string in any supported notation or raises `ValueError`.
+    # Digits are checked to be plain ASCII hex/decimal digits because `int()` also accepts sign, spaces and '_'
+    if s[:1] == '%':
+        # 3-char prefixes (`%IW`, `%MW`) are checked first
+        i = 3
+        tp = _IEC61131PrefixTypes.get(s[:3])
+        if tp is None:
+            i = 2
+            tp = _IEC61131PrefixTypes.get(s[:2])
+        if tp is not None:
+            if s[-1] == cIEC61131SuffixHex:
+                digits = s[i:-1]
+                base = 16
+            else:
+                digits = s[i:]
+                base = 10
+            if digits and _HexDigits.issuperset(digits):
+                try:
+                    offset = int(digits, base)
+                except ValueError:
+                    offset = -1
+                if 0 <= offset <= 65535:
+                    return tp, offset
+    elif s and _DecDigits.issuperset(s):
+        tp, number = divmod(int(s), 100000)
+        if tp in MemoryTypeSet and 1 <= number <= 65536:
+            return tp, number - 1
+    raise ValueError(f"Invalid str '{s}' to convert into Address")
+## @endcond
+
 class Address:
     """Modbus Data Address class. Represents Modbus Data Address.
 
@@ -47,7 +98,11 @@ class Address:
 
     Class supports next operators and standard functions:
     +, -, <, <=, >, >=, ==, !=, hash(), str(), int()
+
+    Object has no `__dict__` (uses `__slots__`) and keeps its integer representation
+    (`toint()`) precomputed, so comparison and hashing are single integer operations.
     """
+    __slots__ = ('_type', '_offset', '_int')
 
     def __init__(self, value=None, offset=None):
         """Constructor of the class.
@@ -63,6 +118,7 @@ class Address:
         """
         self._type = Memory_Unknown
         self._offset = 0
+        self._int = Memory_Unknown * 100000 + 1
         if value is None:
             pass
         elif isinstance(value, int) and offset is None:
@@ -91,6 +147,7 @@ class Address:
         if tp not in MemoryTypeSet:
             raise ValueError(f"Invalid memory type: {tp}. Memory type must be [0,1,3,4]")
         self._type = tp
+        self._int = tp * 100000 + self._offset + 1
 
     def offset(self) -> int:
         """Returns memory offset of Modbus Data Address.
@@ -103,6 +160,7 @@ class Address:
         if not (0 <= offset <= 65535):
             raise ValueError(f"Invalid offset: {offset}. Offset must be in range [0:65535]")
         self._offset = offset
+        self._int = self._type * 100000 + offset + 1
 
     def number(self) -> int:
         """ Returns memory number (offset+1) of Modbus Data Address.
@@ -121,6 +179,7 @@ class Address:
         if number < 1 or number > 65536:
             self._type = Memory_Unknown
             self._offset = 0
+            self._int = Memory_Unknown * 100000 + 1
             raise ValueError(f"Invalid integer '{v}' to convert into Address: number part '{number}' must be [1:65536]")
 
         mem_type = v // 100000
@@ -134,62 +193,18 @@ class Address:
         """Converts current Modbus Data Address to `int`,
         e.g. `Address(Memory_4x, 0)` will be converted to `400001`.
         """
-        return (self._type * 100000) + self.number()
+        return self._int
 
     def fromstr(self, s: str):
-        """Make modbus address from string representaion
-        """
-        def dec_digit(c):
-            return int(c) if c.isdigit() else -1
-
-        def hex_digit(c):
-            try:
-                return int(c, 16)
-            except ValueError:
-                return -1
-
-        if s.startswith('%'):
-            i = 0
-            if s.startswith(sIEC61131Prefix3x):
-                self._type = Memory_3x
-                i = len(sIEC61131Prefix3x)
-            elif s.startswith(sIEC61131Prefix4x):
-                self._type = Memory_4x
-                i = len(sIEC61131Prefix4x)
-            elif s.startswith(sIEC61131Prefix0x):
-                self._type = Memory_0x
-                i = len(sIEC61131Prefix0x)
-            elif s.startswith(sIEC61131Prefix1x):
-                self._type = Memory_1x
-                i = len(sIEC61131Prefix1x)
-            else:
-                raise ValueError(f"Invalid str '{s}' to convert into Address")
-
-            offset = 0
-            suffix = s[-1]
-            if suffix == cIEC61131SuffixHex:
-                for c in s[i:-1]:
-                    offset *= 16
-                    d = hex_digit(c)
-                    if d < 0:
-                        return Address()
-                    offset += d
-            else:
-                for c in s[i:]:
-                    offset *= 10
-                    d = dec_digit(c)
-                    if d < 0:
-                        return Address()
-                    offset += d
-            self.setoffset(offset)
-        else:
-            acc = 0
-            for c in s:
-                d = dec_digit(c)
-                if d < 0:
-                    return Address()
-                acc = acc * 10 + d
-            self.fromint(acc)
+        """Make modbus address from string representaion.
+
+        Supports Modbus (`400001`), IEC-61131 (`%MW0`) and IEC-61131 Hex (`%MW0000h`) notations.
+        Raises `ValueError` if string is not valid address.
+        """
+        tp, offset = _parsestr(s)
+        self._type = tp
+        self._offset = offset
+        self._int = tp * 100000 + offset + 1
 
     def tostr(self, notation: int = Notation_Default) -> str:
         """Returns string repr of Modbus Data Address with specified notation:
@@ -214,55 +229,73 @@ class Address:
         else:
             return to_dec_string(self.toint(), 6)
 
+    def _make(self, offset: int):
+        # Fast copy of the current valid address with new (checked) offset
+        a = Address.__new__(Address)
+        a._type = self._type
+        a._offset = offset
+        a._int = self._int + offset - self._offset
+        return a
+
     def __int__(self):
         """Return the integer representation of the object by calling the toint() method.
         """
-        return self.toint()
+        return self._int
 
     def __lt__(self, other):
         """Return self.toint() < other.toint()
         """
-        return self.toint() < other.toint()
+        return self._int < other._int
     
     def __le__(self, other):
         """Return self.toint() <= other.toint()
         """
-        return self.toint() <= other.toint()
+        return self._int <= other._int
 
     def __eq__(self, other):
         """Return self.toint() == other.toint()
         """
-        return self.toint() == other.toint()
+        if isinstance(other, Address):
+            return self._int == other._int
+        return NotImplemented
 
     def __ne__(self, other):
         """Return self.toint() != other.toint()
         """
-        return self.toint() != other.toint()
+        if isinstance(other, Address):
+            return self._int != other._int
+        return NotImplemented
     
     def __gt__(self, other):
         """Return self.toint() > other.toint()
         """
-        return self.toint() > other.toint()
+        return self._int > other._int
 
     def __ge__(self, other):
         """Return self.toint() >= other.toint()
         """
-        return self.toint() >= other.toint()
+        return self._int >= other._int
 
     def __hash__(self):
         """Return the hash of the object.
         """
-        return self.toint()
+        return self._int
 
     def __add__(self, other: int):
         """Return a new Address object with the offset increased by the given integer.
         """
-        return Address(self._type, self._offset + other)
+        offset = self._offset + other
+        if self._type != Memory_Unknown and 0 <= offset <= 65535:
+            return self._make(offset)
+        return Address(self._type, offset)
 
     def __sub__(self, other: int):
         """ Return a new Address object with the offset decreased by the given integer.
         """
-        return Address(self._type, self._offset - other)
+        offset = self._offset - other
+        if self._type != Memory_Unknown and 0 <= offset <= 65535:
+            return self._make(offset)
+        return Address(self._type, offset)
 
     def __iadd__(self, other: int):
         """Increase the offset by the given integer.
@@ -285,3 +318,316 @@ class Address:
         """Return the string representation of the object.
         """
         return self.tostr(Notation_Default)
+
+
+## @cond
+def _toaddress(value) -> Address:
+    return value if isinstance(value, Address) else Address(value)
+
+def _rangekey(tp: int, offset: int) -> int:
+    # Sort key of the address: memory types never overlap
+    return (tp << 16) | offset
+## @endcond
+
+
+class AddressRange:
+    """Contiguous range of Modbus Data Addresses of the same memory type.
+
+    E.g. `modbus.AddressRange("%MW100", 10)` represents addresses `400101`...`400110`.
+
+    Class supports next operators and standard functions:
+    len(), iter(), [] (index and slice), in, &, ==, !=, hash(), str()
+
+    Object has no `__dict__` (uses `__slots__`).
+    """
+    __slots__ = ('_start', '_count')
+
+    def __init__(self, start, count: int):
+        """Constructor of the class.
+
+        Args:
+            start  First address of the range: `Address`, `int` or `str` address.
+            count  Count of addresses in the range (`0` means empty range).
+
+        Raises `ValueError` if range is out of memory.
+        """
+        start = _toaddress(start)
+        if not start.isvalid():
+            raise ValueError("Invalid start address of AddressRange")
+        if count < 0 or start._offset + count > 65536:
+            raise ValueError(f"Invalid count: {count}. Range must be within [0:65535] offsets")
+        self._start = start
+        self._count = count
+
+    def type(self) -> int:
+        """Returns memory type of the range.
+        """
+        return self._start._type
+
+    def offset(self) -> int:
+        """Returns offset of the first address of the range.
+        """
+        return self._start._offset
+
+    def count(self) -> int:
+        """Returns count of addresses in the range.
+        """
+        return self._count
+
+    def start(self) -> Address:
+        """Returns first address of the range.
+        """
+        return self._start
+
+    def stop(self) -> int:
+        """Returns offset next after the last address of the range (`offset() + count()`).
+        """
+        return self._start._offset + self._count
+
+    def intersects(self, other) -> bool:
+        """Returns `True` if ranges have at least one common address.
+        """
+        return (self._start._type == other._start._type and
+                self._start._offset < other._start._offset + other._count and
+                other._start._offset < self._start._offset + self._count)
+
+    def intersection(self, other):
+        """Returns common part of the ranges as `AddressRange` or `None` if ranges don't intersect.
+        """
+        if not self.intersects(other):
+            return None
+        begin = max(self._start._offset, other._start._offset)
+        end = min(self._start._offset + self._count, other._start._offset + other._count)
+        return AddressRange(self._start._make(begin), end - begin)
+
+    def __and__(self, other):
+        """Same as `intersection()`.
+        """
+        return self.intersection(other)
+
+    def __len__(self):
+        """Returns count of addresses in the range.
+        """
+        return self._count
+
+    def __iter__(self):
+        """Iterates over all addresses of the range.
+        """
+        start = self._start
+        for offset in range(start._offset, start._offset + self._count):
+            yield start._make(offset)
+
+    def __getitem__(self, index):
+        """Returns `Address` for `int` index or `AddressRange` for slice (step must be 1).
+        """
+        if isinstance(index, slice):
+            begin, end, step = index.indices(self._count)
+            if step != 1:
+                raise ValueError("AddressRange slice step must be 1")
+            return AddressRange(self._start._make(self._start._offset + begin), max(end - begin, 0))
+        if index < 0:
+            index += self._count
+        if not (0 <= index < self._count):
+            raise IndexError("AddressRange index out of range")
+        return self._start._make(self._start._offset + index)
+
+    def __contains__(self, item):
+        """Returns `True` if `Address` (`int`/`str` address) or whole `AddressRange` is within the range.
+        """
+        if isinstance(item, AddressRange):
+            return (item._start._type == self._start._type and
+                    self._start._offset <= item._start._offset and
+                    item._start._offset + item._count <= self._start._offset + self._count)
+        item = _toaddress(item)
+        return item._type == self._start._type and 0 <= item._offset - self._start._offset < self._count
+
+    def __eq__(self, other):
+        """Returns `True` if ranges have the same start and count.
+        """
+        if isinstance(other, AddressRange):
+            return self._start._int == other._start._int and self._count == other._count
+        return NotImplemented
+
+    def __ne__(self, other):
+        """Returns `True` if ranges have different start or count.
+        """
+        if isinstance(other, AddressRange):
+            return self._start._int != other._start._int or self._count != other._count
+        return NotImplemented
+
+    def __hash__(self):
+        """Return the hash of the object.
+        """
+        return hash((self._start._int, self._count))
+
+    def __repr__(self):
+        """Return the string representation of the object.
+        """
+        return f"AddressRange({self._start}, {self._count})"
+
+    def __str__(self):
+        """Return the string representation of the object.
+        """
+        return self.__repr__()
+
+
+class AddressIndex:
+    """Interval index which maps address to the value (e.g. tag) of the range that covers it.
+
+    Ranges in the index can't overlap. Search of the range takes O(log n) time.
+
+    Example:
+        index = modbus.AddressIndex()
+        index.add(modbus.AddressRange("%MW0", 2), "temperature")
+        index.add(modbus.AddressRange("%MW2", 1), "status")
+        index.get("%MW1")   # "temperature"
+    """
+
+    def __init__(self, items=None):
+        """Constructor of the class.
+
+        Args:
+            items  Optional iterable of `(AddressRange, value)` pairs.
+        """
+        ## @cond
+        self._keys = []     # sorted keys of range begins
+        self._ends = []     # keys next after range ends
+        self._ranges = []
+        self._values = []
+        ## @endcond
+        if items is not None:
+            for r, value in items:
+                self.add(r, value)
+
+    def add(self, r: AddressRange, value=None):
+        """Add range `r` with associated `value` into the index.
+
+        Raises `ValueError` if range is empty or overlaps range which is already in the index.
+        """
+        if r._count == 0:
+            raise ValueError("Can't add empty AddressRange into AddressIndex")
+        key = _rangekey(r._start._type, r._start._offset)
+        end = key + r._count
+        i = bisect_right(self._keys, key)
+        if (i > 0 and self._ends[i-1] > key) or (i < len(self._keys) and self._keys[i] < end):
+            raise ValueError(f"{r} overlaps range which is already in AddressIndex")
+        self._keys.insert(i, key)
+        self._ends.insert(i, end)
+        self._ranges.insert(i, r)
+        self._values.insert(i, value)
+
+    def find(self, adr):
+        """Returns `(AddressRange, value)` pair for range that covers `adr` or `None`.
+
+        Args:
+            adr  `Address`, `int` or `str` address.
+        """
+        adr = _toaddress(adr)
+        key = _rangekey(adr._type, adr._offset)
+        i = bisect_right(self._keys, key) - 1
+        if i >= 0 and key < self._ends[i]:
+            return self._ranges[i], self._values[i]
+        return None
+
+    def get(self, adr, default=None):
+        """Returns value of range that covers `adr` or `default` if there is no such range.
+        """
+        r = self.find(adr)
+        return default if r is None else r[1]
+
+    def ranges(self) -> list:
+        """Returns list of all ranges of the index sorted by address.
+        """
+        return list(self._ranges)
+
+    def coalesce(self, gap: int = 0) -> list:
+        """Returns ranges of the index merged into contiguous blocks (see `modbus.coalesce()`).
+        """
+        return coalesce(self._ranges, gap)
+
+    def __len__(self):
+        """Returns count of ranges in the index.
+        """
+        return len(self._ranges)
+
+    def __iter__(self):
+        """Iterates over `(AddressRange, value)` pairs sorted by address.
+        """
+        return zip(self._ranges, self._values)
+
+    def __contains__(self, adr):
+        """Returns `True` if `adr` is covered by any range of the index.
+        """
+        return self.find(adr) is not None
+
+
+def coalesce(ranges, gap: int = 0) -> list:
+    """Merge ranges into the minimal list of contiguous `AddressRange` blocks.
+
+    Ranges of the same memory type which overlap, touch each other or are separated
+    by no more than `gap` addresses are merged into single block. It can be used to
+    group many small tags into few block reads.
+
+    Args:
+        ranges  Iterable of `AddressRange` (or `Address` which is treated as range of 1).
+        gap     Max count of unused addresses between ranges which are still merged.
+
+    Returns:
+        List of `AddressRange` sorted by address.
+    """
+    items = []
+    for r in ranges:
+        if isinstance(r, Address):
+            items.append((_rangekey(r._type, r._offset), 1, r))
+        elif r._count:
+            items.append((_rangekey(r._start._type, r._start._offset), r._count, r._start))
+    items.sort(key=lambda item: item[0])
+    res = []
+    curstart = None
+    for key, count, start in items:
+        end = key + count
+        if curstart is not None and (key >> 16) == (curkey >> 16) and key <= curend + gap:
+            if end > curend:
+                curend = end
+            continue
+        if curstart is not None:
+            res.append(AddressRange(curstart, curend - curkey))
+        curstart = start
+        curkey = key
+        curend = end
+    if curstart is not None:
+        res.append(AddressRange(curstart, curend - curkey))
+    return res
+
+
+def parse_many(addresses) -> tuple:
+    """Convert many addresses at once.
+
+    Args:
+        addresses  Iterable of `str` (any supported notation), `int` or `Address` values.
+
+    Returns:
+        Tuple `(types, offsets)` of `array.array` objects (typecodes `'b'` and `'H'`)
+        with memory type and offset of every address in the same order.
+
+    Raises `ValueError` for the first invalid address.
+
+    Example:
+        types, offsets = modbus.parse_many(["%MW0", "400002", 100001])
+    """
+    types = array('b')
+    offsets = array('H')
+    addtype = types.append
+    addoffset = offsets.append
+    for a in addresses:
+        if isinstance(a, str):
+            tp, offset = _parsestr(a)
+        elif isinstance(a, Address):
+            if not a.isvalid():
+                raise ValueError("Invalid address")
+            tp, offset = a._type, a._offset
+        else:
+            tp, offset = _parseint(a)
+        addtype(tp)
+        addoffset(offset)
+    return types, offsets
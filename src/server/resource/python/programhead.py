@@ -3,6 +3,8 @@
 from os import sys, path
 from time import sleep, time
 import argparse
+import asyncio
+import inspect
 
 _parser = argparse.ArgumentParser()
 _parser.add_argument('-prj', '--project', type=str, default="")
@@ -33,4 +35,14 @@ builtins.mem3x = mem3x
 builtins.mem4x = mem4x
 
 _mb_time_period = _args.period / 1000
+_mb_scheduler = mbdevice.getscheduler()
+_mb_scheduler.setperiod(_args.period)
+
+# Run `async def loop()` defined by `Init`-script (asyncio runtime) instead of `Loop`-script
+def _mb_runasync():
+    loop = globals().get('loop')
+    if not inspect.iscoroutinefunction(loop):
+        return False
+    mbdevice.runasync(loop())
+    return True
 
@@ -29,18 +29,53 @@ typedef struct
     //char stringTable[1];
 } DeviceBlock;
 
+// Bits of `DeviceBlock::flags`
+#define MB_DEVICEFLAG_RUN  1 // device script is running
+#define MB_DEVICEFLAG_SYNC 2 // memory sync pass is in progress (`cycle` is incremented at the end of pass)
+
+// Version of python block layout:
+// 0 - `pycycle` only
+// 1 - loop statistics (times in microsec) written by python scheduler at the start of every cycle
+#define MB_PYTHONBLOCK_VERSION 1
+
+// Count of buckets of loop start jitter histogram (bounds are defined by `MB_LOOPJITTER_BUCKETS` in mbserver.py)
+#define MB_LOOPJITTER_BUCKET_COUNT 8
+
 typedef struct
 {
     uint32_t pycycle;
+    uint32_t version;
+    uint32_t period;
+    uint32_t execLast;
+    uint32_t execMin;
+    uint32_t execMax;
+    uint32_t execAvg;
+    uint32_t overrunCount;
+    uint32_t lockTime;
+    uint32_t lockCount;
+    uint32_t jitterHist[MB_LOOPJITTER_BUCKET_COUNT];
 } PythonBlock;
 
 
+// Version of memory block layout:
+// 0 - single coalesced change range (`changeByteOffset`, `changeByteCount`)
+// 1 - dirty page bitmap after memory mask, change range is kept for compatibility
+// 2 - server change counter and page change stamps (after dirty page bitmap)
+#define MB_MEMORYBLOCK_VERSION 2
+
+// Size of the dirty page as power of 2 (64 bytes = 512 bits = 32 registers)
+#define MB_DIRTYPAGE_SHIFT 6
+
 typedef struct
 {
     uint32_t changeCounter;
     uint32_t changeByteOffset;
     uint32_t changeByteCount;
-    uint32_t dummy;
+    uint32_t version;
+    uint32_t dirtyPageShift;
+    uint32_t dirtyPageCount;
+    uint32_t serverChangeCounter;
+    uint32_t reserved1;
 } MemoryBlockHeader;
 
 struct MemWork
@@ -51,9 +86,90 @@ struct MemWork
     MemoryBlockHeader *shmHeader;
     uint8_t *shmMem;
     uint8_t *shmMask;
+    uint8_t *shmDirty;
+    uint32_t *shmStamps;
+    QByteArray devBuffer;
+    uint32_t sizeBytes;
     uint32_t changeCounter;
 };
 
+inline uint32_t dirtyPageCount(uint32_t bytes)
+{
+    return (bytes + (1 << MB_DIRTYPAGE_SHIFT) - 1) >> MB_DIRTYPAGE_SHIFT;
+}
+
+inline size_t memBlockStampsOffset(uint32_t bytes)
+{
+    // header + memory + mask + dirty page bitmap (aligned to 4 bytes)
+    return (sizeof(MemoryBlockHeader) + bytes*2 + (dirtyPageCount(bytes)+7)/8 + 3) & ~static_cast<size_t>(3);
+}
+
+inline size_t memBlockSize(uint32_t bytes)
+{
+    // header + memory + mask + dirty page bitmap + page change stamps
+    return memBlockStampsOffset(bytes) + dirtyPageCount(bytes)*sizeof(uint32_t);
+}
+
+void syncDirtyPages(MemWork &w)
+{
+    MemoryBlockHeader *head = w.shmHeader;
+    const uint32_t shift = head->dirtyPageShift;
+    const uint32_t pageCount = head->dirtyPageCount;
+    uint8_t *dirty = w.shmDirty;
+    uint32_t p = 0;
+    while (p < pageCount)
+    {
+        if (dirty[p >> 3] == 0)
+        {
+            p = (p | 7) + 1; // skip the rest of clean bitmap byte
+            continue;
+        }
+        if ((dirty[p >> 3] & (1 << (p & 7))) == 0)
+        {
+            ++p;
+            continue;
+        }
+        uint32_t first = p;
+        while ((p < pageCount) && (dirty[p >> 3] & (1 << (p & 7))))
+            ++p;
+        uint32_t byteOffset = first << shift;
+        uint32_t byteEnd = p << shift;
+        if (byteEnd > w.sizeBytes)
+            byteEnd = w.sizeBytes;
+        w.devMemBlock->memSetMask(byteOffset, w.shmMem+byteOffset, w.shmMask+byteOffset, byteEnd-byteOffset);
+        memset(w.shmMask+byteOffset, 0, byteEnd-byteOffset);
+    }
+    memset(dirty, 0, (pageCount+7)/8);
+}
+
+void syncServerPages(MemWork &w)
+{
+    // Copy device memory into shared memory page by page. Every page that differs
+    // (was changed by server side, e.g. by Modbus client) is stamped with the new
+    // value of `serverChangeCounter`, so python side can get changed ranges only
+    MemoryBlockHeader *head = w.shmHeader;
+    uint8_t *buff = reinterpret_cast<uint8_t*>(w.devBuffer.data());
+    w.devMemBlock->memGet(0, buff, w.sizeBytes);
+    const uint32_t pageSize = 1 << head->dirtyPageShift;
+    const uint32_t stamp = head->serverChangeCounter + 1;
+    bool changed = false;
+    uint32_t p = 0;
+    for (uint32_t offset = 0; offset < w.sizeBytes; offset += pageSize, ++p)
+    {
+        uint32_t c = w.sizeBytes - offset;
+        if (c > pageSize)
+            c = pageSize;
+        if (memcmp(w.shmMem+offset, buff+offset, c))
+        {
+            memcpy(w.shmMem+offset, buff+offset, c);
+            w.shmStamps[p] = stamp;
+            changed = true;
+        }
+    }
+    if (changed)
+        head->serverChangeCounter = stamp;
+}
+
 QSharedMemory::SharedMemoryError initMem(QSharedMemory &mem, size_t size)
 {
     mem.create(static_cast<int>(size));
@@ -126,10 +242,14 @@ void mbServerRunScriptThread::run()
     int szMemDev = sizeof(DeviceBlock)+szMemDevStringTable;
     initMem(memDev, szMemDev);
     initMem(memPy, sizeof(PythonBlock));
-    initMem(mem0x, sizeof(MemoryBlockHeader)+m_device->count_0x_bytes()*2);
-    initMem(mem1x, sizeof(MemoryBlockHeader)+m_device->count_1x_bytes()*2);
-    initMem(mem3x, sizeof(MemoryBlockHeader)+m_device->count_3x_bytes()*2);
-    initMem(mem4x, sizeof(MemoryBlockHeader)+m_device->count_4x_bytes()*2);
+    initMem(mem0x, memBlockSize(m_device->count_0x_bytes()));
+    initMem(mem1x, memBlockSize(m_device->count_1x_bytes()));
+    initMem(mem3x, memBlockSize(m_device->count_3x_bytes()));
+    initMem(mem4x, memBlockSize(m_device->count_4x_bytes()));
+
+    PythonBlock *pyMem = reinterpret_cast<PythonBlock*>(memPy.data());
+    memset(pyMem, 0, sizeof(PythonBlock));
+    pyMem->version = MB_PYTHONBLOCK_VERSION;
 
     DeviceBlock *devMem = reinterpret_cast<DeviceBlock*>(memDev.data());
     devMem->count0x = m_device->count_0x();
@@ -172,6 +292,21 @@ void mbServerRunScriptThread::run()
     memWork[2].shmMask = reinterpret_cast<uint8_t*>(mem3x.data())+sizeof(MemoryBlockHeader)+m_device->count_3x_bytes();
     memWork[3].shmMask = reinterpret_cast<uint8_t*>(mem4x.data())+sizeof(MemoryBlockHeader)+m_device->count_4x_bytes();
 
+    memWork[0].sizeBytes = m_device->count_0x_bytes();
+    memWork[1].sizeBytes = m_device->count_1x_bytes();
+    memWork[2].sizeBytes = m_device->count_3x_bytes();
+    memWork[3].sizeBytes = m_device->count_4x_bytes();
+
+    memWork[0].shmDirty = memWork[0].shmMask+memWork[0].sizeBytes;
+    memWork[1].shmDirty = memWork[1].shmMask+memWork[1].sizeBytes;
+    memWork[2].shmDirty = memWork[2].shmMask+memWork[2].sizeBytes;
+    memWork[3].shmDirty = memWork[3].shmMask+memWork[3].sizeBytes;
+
+    memWork[0].shmStamps = reinterpret_cast<uint32_t*>(reinterpret_cast<uint8_t*>(mem0x.data())+memBlockStampsOffset(memWork[0].sizeBytes));
+    memWork[1].shmStamps = reinterpret_cast<uint32_t*>(reinterpret_cast<uint8_t*>(mem1x.data())+memBlockStampsOffset(memWork[1].sizeBytes));
+    memWork[2].shmStamps = reinterpret_cast<uint32_t*>(reinterpret_cast<uint8_t*>(mem3x.data())+memBlockStampsOffset(memWork[2].sizeBytes));
+    memWork[3].shmStamps = reinterpret_cast<uint32_t*>(reinterpret_cast<uint8_t*>(mem4x.data())+memBlockStampsOffset(memWork[3].sizeBytes));
+
     memWork[0].changeCounter = memWork[0].shmHeader->changeCounter;
     memWork[1].changeCounter = memWork[1].shmHeader->changeCounter;
     memWork[2].changeCounter = memWork[2].shmHeader->changeCounter;
@@ -182,14 +317,23 @@ void mbServerRunScriptThread::run()
     {
         memWork[i].devMemChangeCounter = memWork[i].devMemBlock->changeCounter();
         QSharedMemory &shm = *memWork[i].shm;
+        MemoryBlockHeader *head = memWork[i].shmHeader;
         shm.lock();
         memWork[i].devMemBlock->memGet(0, memWork[i].shmMem, memWork[i].devMemBlock->sizeBytes());
+        head->changeByteOffset = 0xFFFFFFFF;
+        head->changeByteCount = 0;
+        head->dirtyPageShift = MB_DIRTYPAGE_SHIFT;
+        head->dirtyPageCount = dirtyPageCount(memWork[i].sizeBytes);
+        head->serverChangeCounter = 0;
+        memset(memWork[i].shmStamps, 0, head->dirtyPageCount*sizeof(uint32_t));
+        memWork[i].devBuffer.resize(static_cast<int>(memWork[i].sizeBytes));
+        head->version = MB_MEMORYBLOCK_VERSION;
         shm.unlock();
     }
 
     qDebug() << "Control: key =" << memDev.key() << " nativeKey =" << memDev.nativeKey();
 
-    devMem->flags |= 1;
+    devMem->flags |= MB_DEVICEFLAG_RUN;
     //devMem->flags = 0;
     m_ctrlRun = true;
 
@@ -271,6 +415,10 @@ void mbServerRunScriptThread::run()
     while (m_ctrlRun)
     {
         eloop.processEvents();
+        // Memory blocks are locked one at a time, so C++ side never holds two block locks.
+        // Pass is marked by `MB_DEVICEFLAG_SYNC` flag so python `mbdevice.snapshot()`
+        // can detect the pass overlapped with its copy and retry it
+        devMem->flags |= MB_DEVICEFLAG_SYNC;
         for (int i = 0; i < 4; i++)
         {
             QSharedMemory &shm = *memWork[i].shm;
@@ -279,9 +427,14 @@ void mbServerRunScriptThread::run()
             if (memWork[i].changeCounter != head->changeCounter)
             {
                 //qDebug() << "New Header:" << head->changeCounter << ". Offset:" << head->changeByteOffset << ". Count: " << head->changeByteCount;
-                uint32_t byteOffset = head->changeByteOffset;
-                memWork[i].devMemBlock->memSetMask(byteOffset, memWork[i].shmMem+byteOffset, memWork[i].shmMask+byteOffset, head->changeByteCount);
-                memset(memWork[i].shmMask+byteOffset, 0, head->changeByteCount);
+                if (head->version >= 1)
+                    syncDirtyPages(memWork[i]);
+                else if (head->changeByteCount)
+                {
+                    uint32_t byteOffset = head->changeByteOffset;
+                    memWork[i].devMemBlock->memSetMask(byteOffset, memWork[i].shmMem+byteOffset, memWork[i].shmMask+byteOffset, head->changeByteCount);
+                    memset(memWork[i].shmMask+byteOffset, 0, head->changeByteCount);
+                }
                 head->changeByteOffset = 0xFFFFFFFF;
                 head->changeByteCount = 0;
                 memWork[i].changeCounter = head->changeCounter;
@@ -289,16 +442,17 @@ void mbServerRunScriptThread::run()
             if (memWork[i].devMemChangeCounter != memWork[i].devMemBlock->changeCounter())
             {
                 memWork[i].devMemChangeCounter = memWork[i].devMemBlock->changeCounter();
-                memWork[i].devMemBlock->memGet(0, memWork[i].shmMem, memWork[i].devMemBlock->sizeBytes());
+                syncServerPages(memWork[i]);
             }
             shm.unlock();
         }
         devMem->cycle++;
+        devMem->flags &= (~MB_DEVICEFLAG_SYNC);
         mb::msleep(1);
     }
 
     // Finish process
-    devMem->flags &= (~1);
+    devMem->flags &= (~MB_DEVICEFLAG_RUN);
     if (py.state() != QProcess::NotRunning)
     {
         tm = mb::currentTimestamp();
@@ -361,12 +515,8 @@ QString mbServerRunScriptThread::getScriptLoop()
     res += "#############################################\n"
            "############## USER CODE: LOOP ##############\n"
            "#############################################\n\n";
-    res += "_mb_time_start = 0.0\n";
-    res += "while (mbdevice.getflags() & 1):\n";
-    res += "    if (time() - _mb_time_start) < _mb_time_period:\n";
-    res += "        sleep(0.001)\n";
-    res += "        continue\n";
-    res += "    _mb_time_start = time()\n";
+    res += "_mb_async = _mb_runasync()\n";
+    res += "while not _mb_async and _mb_scheduler.wait():\n";
     QStringList lines = m_scriptLoop.split('\n', Qt::SkipEmptyParts);
     bool multiline = false;
     Q_FOREACH(const QString &line, lines)
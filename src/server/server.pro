@@ -39,5 +39,6 @@ RC_ICONS = gui/icons/mbserver.ico
 
 DISTFILES += \
     python/mbconfig.py \
+    python/mbscheduler.py \
     python/mbserver.py \
     python/modbus.py